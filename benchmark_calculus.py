@@ -0,0 +1,323 @@
+"""
+benchmark_calculus.py
+This script benchmarks the integration and root finding algorithms of calculus.py,
+including the ctypes implementations, on the functions of the README.
+
+Every case is warmed up, timed with time.perf_counter_ns over several repeats and
+reported as median and interquartile range. The peak memory of one extra run is
+recorded with tracemalloc (NumPy buffers are traced, memory allocated in C++ is not).
+
+Usage:
+    python benchmark_calculus.py --sizes 100 1000 10000 --output results.json
+    python benchmark_calculus.py --output new.csv --baseline results.json
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import calculus as calc
+import result_cache
+
+# README integrals: name, integrand, bounds and the matching native function
+INTEGRANDS = [
+    ("exp(-1/x)", calc.func1, 0.01, 10, "exp(-1/x)"),
+    ("cos(1/x)", calc.func2, 0.01, 3 * np.pi, "cos(1/x)"),
+    ("x^3+1", calc.func3, -1, 1, "polynomial"),
+]
+
+# README root problems: name, function, derivative, bracket and native function
+ROOT_PROBLEMS = [
+    ("tanh(x)", calc.func_2, lambda x: 1 - np.tanh(x) ** 2, (-1, 1), "tanh(x)"),
+    ("sin(x)", calc.func_3, math.cos, (3, 4), "sin(x)"),
+]
+
+# Integrators with a number of steps n: method(func, a, b, n, native_name)
+FIXED_STEP_METHODS = {
+    "wrapper_simpson": lambda f, a, b, n, _: calc.wrapper_simpson(f, a, b, n),
+    "simpsons_rule": lambda f, a, b, n, _: calc.simpsons_rule(f, a, b, n + n % 2),
+    "trapezoid": lambda f, a, b, n, _: calc.trapezoid(f, a, b, n),
+    "trapezoid_python": lambda f, a, b, n, _: calc.trapezoid_python(f, a, b, n),
+    "trapezoid_numpy": lambda f, a, b, n, _: calc.trapezoid_numpy(f, a, b, n),
+    "trapezoid_scipy": lambda f, a, b, n, _: calc.trapezoid_scipy(f, a, b, n),
+    "adapt": lambda f, a, b, n, _: calc.adapt(f, [a, b], n, 10),
+    "parallel_integrate": lambda f, a, b, n, _: calc.parallel_integrate(f, (a, b), n),
+    "adapt_c": lambda f, a, b, n, _: calc.adapt_c(f, a, b, n, 10),
+    "adapt_c_batch": lambda f, a, b, n, _: calc.adapt_c_batch(f, a, b, n, 10),
+    "adapt_c (native)": lambda f, a, b, n, native: calc.adapt_c(native_function(native),
+                                                                 a, b, n, 10),
+    "integrate_native": lambda f, a, b, n, native: integrate_native(native, a, b, n),
+}
+
+# Integrators driven by a tolerance or a fixed order, benchmarked once per function
+TOLERANCE_METHODS = {
+    "adaptive_trap_py": lambda f, a, b: calc.adaptive_trap_py(f, a, b, 1e-6),
+    "romberg": lambda f, a, b: calc.romberg(f, a, b, 1e-8),
+    "integrate_to_tol": lambda f, a, b: calc.integrate_to_tol(f, a, b, 1e-8),
+    "gauss_legendre": lambda f, a, b: calc.gauss_legendre(f, a, b, 20),
+    "gauss_kronrod": lambda f, a, b: calc.gauss_kronrod(f, a, b, 1e-8),
+}
+
+# Root finders: method(func, fprime, bracket, native_name)
+ROOT_METHODS = {
+    "bisection_wrapper": lambda f, fp, ab, _: calc.bisection_wrapper(f, *ab),
+    "bisection_pure_python": lambda f, fp, ab, _: calc.bisection_pure_python(f, *ab),
+    "secant_wrapper": lambda f, fp, ab, _: calc.secant_wrapper(f, *ab),
+    "secant_pure_python": lambda f, fp, ab, _: calc.secant_pure_python(f, *ab),
+    "tangent_pure_python": lambda f, fp, ab, _: calc.tangent_pure_python(f, fp, sum(ab) / 2),
+    "root_tangent": lambda f, fp, ab, _: calc.root_tangent(f, fp, sum(ab) / 2),
+    "secant_root": lambda f, fp, ab, _: calc.secant_root(f, *ab, 1e-10, 100),
+    "secant_root (native)": lambda f, fp, ab, native: calc.secant_root(
+        native_function(native), *ab, 1e-10, 100),
+}
+
+# Columns of the result files, in order
+FIELDS = ["group", "method", "function", "n", "median_ns", "iqr_ns", "min_ns",
+          "repeats", "peak_bytes", "value", "error"]
+
+def native_id(name):
+    """
+    Return the id in lib_calculus.so of a README function, the polynomial is x^3 + 1.
+    """
+    return calc.native_polynomial([1, 0, 0, 1]) if name == "polynomial" else name
+
+def native_function(name):
+    """
+    Return the native function pointer of lib_calculus.so for a README function.
+    """
+    return calc.native_integrand(native_id(name))
+
+def integrate_native(name, a, b, n):
+    """
+    Integrate a README function with the OpenMP kernels of lib_calculus.so.
+    """
+    return calc.integrate_native(native_id(name), (a, b), n)
+
+def time_call(call, repeats=7, warmup=1):
+    """
+    Time a function without arguments.
+
+    Parameters:
+        call (callable): The benchmarked call.
+        repeats (int): Number of timed runs.
+        warmup (int): Number of untimed runs before timing (caches, lazy imports).
+
+    Returns:
+        dict: median_ns, iqr_ns, min_ns, repeats, peak_bytes and the value of the last call.
+    """
+    for _ in range(warmup):
+        call()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        value = call()
+        timings.append(time.perf_counter_ns() - start)
+
+    # Separate run, tracemalloc slows down allocations
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    q1, median, q3 = np.percentile(timings, [25, 50, 75])
+    return {
+        "median_ns": float(median),
+        "iqr_ns": float(q3 - q1),
+        "min_ns": min(timings),
+        "repeats": repeats,
+        "peak_bytes": peak,
+        "value": value}
+
+def result_value(value):
+    """
+    Reduce the return value of an algorithm to the integral or root as a float.
+    """
+    if isinstance(value, dict):
+        value = value.get("integral", value.get("root"))
+    return None if value is None else float(value)
+
+def benchmark_cases(sizes):
+    """
+    Generate all benchmark cases.
+
+    Parameters:
+        sizes (iterable of int): Values of n for the fixed-step integrators.
+
+    Yields:
+        tuple: (group, method, function name, n or None, call without arguments)
+    """
+    for name, func, a, b, native in INTEGRANDS:
+        for method, run in FIXED_STEP_METHODS.items():
+            for n in sizes:
+                yield ("integral", method, name, n,
+                       lambda run=run, func=func, a=a, b=b, n=n, native=native:
+                       run(func, a, b, n, native))
+        for method, run in TOLERANCE_METHODS.items():
+            yield "integral", method, name, None, lambda run=run, func=func, a=a, b=b: run(
+                func, a, b)
+    for name, func, fprime, bracket, native in ROOT_PROBLEMS:
+        for method, run in ROOT_METHODS.items():
+            yield ("root", method, name, None,
+                   lambda run=run, func=func, fprime=fprime, bracket=bracket, native=native:
+                   run(func, fprime, bracket, native))
+
+def run_benchmarks(sizes=(100, 1000, 10000), repeats=7, warmup=1, select=None, cache=None):
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """
+    Run the benchmark cases.
+
+    Parameters:
+        sizes (iterable of int): Values of n for the fixed-step integrators.
+        repeats (int): Number of timed runs per case.
+        warmup (int): Number of untimed runs per case.
+        select (str): Only run methods whose name contains this text.
+        cache (str): Result cache file to reuse earlier timings of unchanged cases
+            from, None to time every case.
+
+    Returns:
+        list of dict: One row per case with the columns in FIELDS. Cases that raise
+        are kept with the error message and empty timings.
+    """
+    rows = []
+    for group, method, function, n, call in benchmark_cases(sizes):
+        if select is not None and select not in method:
+            continue
+        row = dict.fromkeys(FIELDS)
+        row.update(group=group, method=method, function=function, n=n)
+        try:
+            if cache is None:
+                row.update(time_call(call, repeats, warmup))
+            else:
+                row.update(result_cache.cached_call(
+                    lambda call=call: time_call(call, repeats, warmup), call, method,
+                    (group, function, n, repeats, warmup), cache, machine=True))
+            row["value"] = result_value(row["value"])
+        except (ArithmeticError, ValueError, TypeError, OSError) as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    return rows
+
+def write_results(rows, path):
+    """
+    Write benchmark rows to a .json file, or to a .csv file for any other extension.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if path.endswith(".json"):
+            json.dump(rows, file, indent=1)
+        else:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+def read_results(path):
+    """
+    Read benchmark rows written by write_results.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        rows = list(csv.DictReader(file))
+    for row in rows:
+        for field in ("n", "min_ns", "repeats", "peak_bytes"):
+            row[field] = int(row[field]) if row[field] else None
+        for field in ("median_ns", "iqr_ns", "value"):
+            row[field] = float(row[field]) if row[field] else None
+        row["error"] = row["error"] or None
+    return rows
+
+def row_key(row):
+    """
+    Identify a case across benchmark runs.
+    """
+    return row["group"], row["method"], row["function"], row["n"]
+
+def compare_to_baseline(rows, baseline, threshold=0.1):
+    """
+    Compare benchmark rows with a stored baseline.
+
+    A case is a regression if its median is more than `threshold` (relative) slower
+    than the baseline and the difference is larger than the baseline's interquartile
+    range, so noisy cases are not flagged for jitter alone.
+
+    Parameters:
+        rows (list of dict): New benchmark rows.
+        baseline (list of dict): Baseline rows, e.g. from read_results.
+        threshold (float): Allowed relative slowdown.
+
+    Returns:
+        list of dict: group, method, function, n, median_ns, baseline_ns, ratio and
+        regression for every case timed in both runs.
+    """
+    previous = {row_key(row): row for row in baseline if row["median_ns"] is not None}
+    comparison = []
+    for row in rows:
+        old = previous.get(row_key(row))
+        if old is None or row["median_ns"] is None:
+            continue
+        ratio = row["median_ns"] / old["median_ns"] if old["median_ns"] > 0 else math.inf
+        comparison.append({
+            "group": row["group"],
+            "method": row["method"],
+            "function": row["function"],
+            "n": row["n"],
+            "median_ns": row["median_ns"],
+            "baseline_ns": old["median_ns"],
+            "ratio": ratio,
+            "regression": bool(ratio > 1 + threshold
+                               and row["median_ns"] - old["median_ns"] > old["iqr_ns"])})
+    return comparison
+
+def print_rows(rows):
+    """
+    Print benchmark rows as a table.
+    """
+    print(f"{'method':<24}{'function':<12}{'n':>7}{'median [ms]':>14}{'IQR [ms]':>11}"
+          f"{'peak [kB]':>11}")
+    for row in rows:
+        n = "" if row["n"] is None else row["n"]
+        if row["error"] is not None:
+            print(f"{row['method']:<24}{row['function']:<12}{n:>7}  {row['error']}")
+            continue
+        print(f"{row['method']:<24}{row['function']:<12}{n:>7}{row['median_ns'] * 1e-6:>14.4f}"
+              f"{row['iqr_ns'] * 1e-6:>11.4f}{row['peak_bytes'] / 1024:>11.1f}")
+
+def main(argv=None):
+    """
+    Command line entry point. Returns 1 if regressions against the baseline were found.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--select", help="only run methods whose name contains this text")
+    parser.add_argument("--output", help="write the results to a .json or .csv file")
+    parser.add_argument("--baseline", help="compare with results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown flagged as regression")
+    parser.add_argument("--cache", nargs="?", const=result_cache.DEFAULT_PATH,
+                        help="reuse timings of unchanged cases from the result cache")
+    args = parser.parse_args(argv)
+
+    rows = run_benchmarks(args.sizes, args.repeats, args.warmup, args.select, args.cache)
+    print_rows(rows)
+    if args.output:
+        write_results(rows, args.output)
+
+    if args.baseline and os.path.exists(args.baseline):
+        regressions = [row for row in compare_to_baseline(rows, read_results(args.baseline),
+                                                          args.threshold)
+                       if row["regression"]]
+        for row in regressions:
+            print(f"REGRESSION {row['method']} {row['function']} n={row['n']}: "
+                  f"{row['ratio']:.2f}x slower than the baseline")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
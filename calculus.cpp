@@ -9,11 +9,26 @@
  *
  * Usage:
  * Compile this file into a shared library for Python:
- * g++ -shared -o calculus.dll -fPIC calculus.cpp
+ * g++ -shared -o calc.dll -fPIC calculus.cpp
  */
 #include <iostream>
 #include <cmath>    // For NAN (Not-a-Number) representation
 #include <stdbool.h> // For compatibility with C-style bool
+#include <vector>    // Sample buffers for the batch callback
+#include <new>       // std::bad_alloc
+#include <stdexcept> // std::length_error
+
+/**
+ * Largest number of refined samples adapt_c_batch evaluates (512 MB per
+ * buffer). The count is also passed to the callback as an int.
+ */
+const long ADAPT_BATCH_MAX_SAMPLES = 1L << 26;
+
+/**
+ * Batch callback: evaluates the integrand at x[0..count-1] and writes
+ * the values to y[0..count-1].
+ */
+typedef void (*BatchCallback)(const double* x, double* y, int count);
 
 extern "C" {
    double trapezoidal_rule(double (*func)(double), double a, double b, int n) {
@@ -47,7 +62,7 @@ extern "C" {
          return (func(x + h) - 2 * func(x) + func(x - h)) / (h * h);
      }
 
-     float adapt_c(double (*func)(double), double a, double b, int n, int sens){
+     double adapt_c(double (*func)(double), double a, double b, int n, int sens){
        /**
         * This function uses an adaptive algorithm to carry out 
         * trapezoidal integration. It does this by taking the second
@@ -72,6 +87,84 @@ extern "C" {
          }
          return sum;
      }
+     double adapt_c_batch(BatchCallback func, double a, double b, int n, int sens){
+       /**
+        * Batch variant of adapt_c. Instead of calling the integrand
+        * once per sample, the integrand is called twice in total:
+        * once with the n+1 points of the coarse grid, which give
+        * the function values for the second derivatives and the
+        * cell endpoints, and once with the interior points of all
+        * refined cells. Every sample is evaluated exactly once.
+        * The refinement per cell uses the same formula as adapt_c,
+        * but every cell from a to b is integrated (the curvature of
+        * the first cell is taken from its right neighbour) and
+        * cells get at least one trapezoid.
+        * Returns NAN if the curvature is not finite or the refined
+        * cells need more than ADAPT_BATCH_MAX_SAMPLES samples, and
+        * if the buffers cannot be allocated. No C++ exception leaves
+        * this function.
+        */
+         if (func == nullptr || n < 2) {
+             return NAN;
+         }
+         double h = (b - a) / n;
+
+         try {
+             // coarse grid, one batch
+             std::vector<double> x(n + 1), y(n + 1);
+             for (int i = 0; i <= n; i++) {
+                 x[i] = a + i * h;
+             }
+             func(x.data(), y.data(), n + 1);
+
+             // number of trapezoids per cell from the second derivative,
+             // checked in double before the conversion to an integer
+             std::vector<long> der(n);
+             long total = 0;
+             for (int i = 0; i < n; i++) {
+                 int j = (i == 0) ? 1 : i;
+                 double d2 = (y[j + 1] - 2 * y[j] + y[j - 1]) / (h * h);
+                 double d = std::fabs(std::trunc((d2 + 1) * sens));
+                 if (!std::isfinite(d) || d > ADAPT_BATCH_MAX_SAMPLES) {
+                     return NAN;
+                 }
+                 der[i] = d < 1 ? 1 : static_cast<long>(d);
+                 total += der[i] - 1;
+                 if (total > ADAPT_BATCH_MAX_SAMPLES) {
+                     return NAN;
+                 }
+             }
+
+             // interior points of all refined cells, one batch
+             std::vector<double> fx(total), fy(total);
+             long pos = 0;
+             for (int i = 0; i < n; i++) {
+                 double step = h / der[i];
+                 for (long k = 1; k < der[i]; k++) {
+                     fx[pos++] = x[i] + k * step;
+                 }
+             }
+             if (total > 0) {
+                 func(fx.data(), fy.data(), static_cast<int>(total));
+             }
+
+             // trapezoidal summation per cell
+             double sum = 0;
+             pos = 0;
+             for (int i = 0; i < n; i++) {
+                 double cell = 0.5 * (y[i] + y[i + 1]);
+                 for (long k = 1; k < der[i]; k++) {
+                     cell += fy[pos++];
+                 }
+                 sum += cell * h / der[i];
+             }
+             return sum;
+         } catch (const std::bad_alloc&) {
+             return NAN;
+         } catch (const std::length_error&) {
+             return NAN;
+         }
+     }
     /**
      * @brief Verifies if the provided argument is non-negative.
      *
@@ -1,15 +1,58 @@
 """
 calculus.py
 This module implements different integration and root finding algorithms
+
+SciPy and matplotlib are imported by the functions that use them on first call,
+so importing this module (e.g. in every worker process) only loads NumPy.
 """
+# pylint: disable=too-many-lines
+import collections
 import ctypes
+import functools
+import hashlib
+import heapq
+import json
 import math
+import os
+import pickle
+import platform
+import struct
 import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import optimize
-import scipy as sp
-from scipy.integrate import simpson
+import native_backend
+
+__version__ = "0.2.0"
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint():
+    """
+    SHA-256 of the code that computes the results of this module: calculus.py,
+    native_backend.py and the compiled libraries. Cached results and calibration
+    profiles are keyed on it, so any edit or rebuild invalidates them.
+    """
+    digest = hashlib.sha256(__version__.encode())
+    paths = [os.path.abspath(__file__), os.path.abspath(native_backend.__file__)]
+    paths += [os.path.join(native_backend.LIBRARY_DIR, name)
+              for name in native_backend.LIBRARIES.values()]
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        try:
+            with open(path, "rb") as file:
+                digest.update(file.read())
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def machine_fingerprint():
+    """
+    Identity of the machine timings were measured on: host, architecture, processor,
+    number of cores and the Python and NumPy versions.
+    """
+    return " ".join([platform.node(), platform.machine(), platform.processor(),
+                     str(os.cpu_count()), platform.python_version(), np.__version__])
 
 # General function to integrate
 def wrapper_simpson(f, a, b, n=100):
@@ -36,6 +79,7 @@ def wrapper_simpson(f, a, b, n=100):
     y = f(x)
 
     # Apply Simpson's rule
+    from scipy.integrate import simpson  # pylint: disable=import-outside-toplevel
     result = simpson(y, x=x)
 
     return result
@@ -48,15 +92,321 @@ def dummy():
     """
     return 0
 
-def simpsons_rule(func, a, b, n):
+def evaluate_grid(func, x):
+    """
+    Evaluate `func` on every point of the grid `x` and return the samples as an array.
+
+    The whole grid is handed to `func` in a single call first, with NumPy floating
+    point warnings suppressed. This works for integrands built from NumPy ufuncs
+    (func1, func2, func3, np.sin, ...), including masked ones such as
+    np.where(x == 0, 1.0, np.sin(x) / x). Only the points where that call gives inf
+    or NaN are evaluated again with Python floats, so a real singularity still
+    raises ZeroDivisionError (or gives NaN) as the scalar integrand would. If the
+    call fails or returns something that is not one sample per grid point, the whole
+    grid is evaluated point by point instead, so scalar-only callables (math.sin,
+    func_1_safe, ...) behave exactly as they did before.
+
+    Parameters:
+        func (callable): The function to evaluate.
+        x (np.ndarray): 1-D array of grid points.
+
+    Returns:
+        np.ndarray: The values func(x) as a float array of the same shape as `x`.
+    """
+    try:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            y = np.asarray(func(x), dtype=float)
+    except (TypeError, ValueError, FloatingPointError, ZeroDivisionError):
+        y = None
+    if y is None or y.shape != x.shape:
+        # fall back to one call per point for integrands that only accept scalars
+        return np.array([func(xi) for xi in x.tolist()], dtype=float)
+    bad = np.flatnonzero(~np.isfinite(y))
+    if bad.size:
+        y = y.copy()
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            y[bad] = [func(xi) for xi in x[bad].tolist()]
+    return y
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "max_entries", "entries"])
+
+# Approximate memory of one cache entry: int64 key, float64 value and int64 use stamp
+CACHE_ENTRY_BYTES = 24
+
+# Scalar misses collected in a dict before they are merged into the sorted arrays
+CACHE_PENDING_ENTRIES = 4096
+
+# Bit pattern of a float as a signed 64-bit integer, the key of cached_integrand
+FLOAT_BITS = struct.Struct("<d")
+INT_BITS = struct.Struct("<q")
+
+# Flipping the low 63 bits of negative bit patterns orders the keys like the floats
+KEY_ORDER_MASK = 0x7FFFFFFFFFFFFFFF
+
+def ordered_bits(bits):
+    """
+    Convert float64 bit patterns (int64) to cache keys ordered like the floats, so
+    increasing grids give increasing keys (0.0 and -0.0 stay different). The
+    conversion is its own inverse, it also turns keys back into bit patterns.
+    """
+    return bits ^ ((bits >> 63) & KEY_ORDER_MASK)
+
+def cached_integrand(func, max_entries=2**20, max_bytes=None):
+    # pylint: disable=too-many-statements
+    """
+    Wrap `func` in a least-recently-used cache keyed on the exact float value of x
+    (its bit pattern, so 0.0 and -0.0 are different points). The wrapper can be
+    passed to any integrator or root finder in this module. Only the misses are
+    evaluated, in one vectorized call when `func` supports it (see evaluate_grid).
+
+    The cache is kept in NumPy arrays sorted by key, so an array call is split into
+    hits and misses with a few array operations (np.unique, np.searchsorted) instead
+    of one dictionary access per point. Scalar misses, e.g. from root finders, are
+    collected in a small dict and merged in batches of CACHE_PENDING_ENTRIES.
+    Recency is tracked per call: all points of one call count as used at the same
+    time, and eviction drops the points of the oldest calls first (with up to 1/8 of
+    the limit extra at once). Evaluating a
+    cheap NumPy integrand is still faster than any lookup, the cache pays off for
+    expensive integrands and for scalar-only ones.
+
+    Sharing one wrapper between several methods on the same bounds avoids sampling
+    the same points again. Like functools.lru_cache, the wrapper has cache_info()
+    and cache_clear(). Calls with extra arguments, func(x, *params) as made by
+    integrate_many, bisection_many, tangent_many or the secant methods with args,
+    are passed to `func` uncached, since the cache is keyed on x alone.
+
+    Parameters:
+        func (callable): The function to cache.
+        max_entries (int or None): Maximum number of cached points, None for no limit.
+        max_bytes (int or None): Optional memory limit, counted as CACHE_ENTRY_BYTES
+            per entry. cache_info() reports the resulting entry limit.
+
+    Returns:
+        callable: The caching wrapper. Scalars give floats, arrays give float arrays.
+    """
+    limit = math.inf if max_entries is None else max_entries
+    if max_bytes is not None:
+        limit = min(limit, max_bytes // CACHE_ENTRY_BYTES)
+    # sorted keys with their values and the number of the call that used them last
+    cache = {"keys": np.empty(0, np.int64), "values": np.empty(0), "used": np.empty(0, np.int64)}
+    pending = {}    # scalar misses not merged yet: key -> (value, last call)
+    index = {}      # key -> position in the arrays for scalar lookups, built on demand
+    stats = {"hits": 0, "misses": 0, "calls": 0}
+
+    def merge(keys, values, used):
+        # insert sorted new keys, which are not cached yet, keeping the arrays sorted
+        index.clear()
+        if cache["keys"].size == 0:
+            cache.update(keys=keys.copy(), values=np.array(values, dtype=float),
+                         used=np.asarray(used, dtype=np.int64))
+        else:
+            slots = np.searchsorted(cache["keys"], keys) + np.arange(keys.size)
+            old = np.ones(cache["keys"].size + keys.size, dtype=bool)
+            old[slots] = False
+            for name, new in (("keys", keys), ("values", values), ("used", used)):
+                merged = np.empty(old.size, dtype=cache[name].dtype)
+                merged[old], merged[slots] = cache[name], new
+                cache[name] = merged
+        excess = cache["keys"].size - limit
+        if excess > 0:
+            # keep the most recently used entries, in key order, and make room for the
+            # next scalar misses so a full cache does not evict on every miss
+            excess = int(min(excess + min(CACHE_PENDING_ENTRIES, limit // 8),
+                             cache["keys"].size))
+            keep = np.sort(np.argpartition(cache["used"], excess - 1)[excess:])
+            for name in cache:
+                cache[name] = cache[name][keep]
+
+    def flush():
+        keys = np.fromiter(pending, dtype=np.int64, count=len(pending))
+        order = np.argsort(keys)
+        values, used = (np.array(column)[order] for column in zip(*pending.values()))
+        pending.clear()
+        merge(keys[order], values, used)
+
+    def lookup_scalar(x):
+        key = INT_BITS.unpack(FLOAT_BITS.pack(x))[0]
+        key ^= (key >> 63) & KEY_ORDER_MASK
+        if key in pending:
+            value = pending[key][0]
+            pending[key] = (value, stats["calls"])
+            stats["hits"] += 1
+            return value
+        if cache["keys"].size:
+            if not index:
+                # positions of the sorted keys, rebuilt after the arrays change
+                index.update(zip(cache["keys"].tolist(), range(cache["keys"].size)))
+            i = index.get(key)
+            if i is not None:
+                cache["used"][i] = stats["calls"]
+                stats["hits"] += 1
+                return float(cache["values"][i])
+        stats["misses"] += 1
+        value = float(func(x))
+        pending[key] = (value, stats["calls"])
+        if (len(pending) >= CACHE_PENDING_ENTRIES
+                or cache["keys"].size + len(pending) > limit):
+            flush()
+        return value
+
+    @functools.wraps(func)
+    def wrapper(x, *args, **kwargs):
+        if args or kwargs:
+            return func(x, *args, **kwargs)
+        stats["calls"] += 1
+        if isinstance(x, (float, int)):
+            return lookup_scalar(float(x))
+        values = np.asarray(x, dtype=float)
+        if values.ndim == 0:
+            return lookup_scalar(float(values))
+        if pending:
+            flush()
+
+        # increasing grids skip np.unique
+        flat = values.ravel()
+        keys, inverse = ordered_bits(flat.view(np.int64)), None
+        if keys.size > 1 and not np.all(keys[1:] > keys[:-1]):
+            keys, inverse = np.unique(keys, return_inverse=True)
+
+        # a grid that was cached before is one contiguous block of the sorted keys
+        first = int(np.searchsorted(cache["keys"], keys[0])) if keys.size else 0
+        block = slice(first, first + keys.size)
+        if inverse is None and np.array_equal(cache["keys"][block], keys):
+            cache["used"][block] = stats["calls"]
+            stats["hits"] += flat.size
+            return cache["values"][block].reshape(values.shape).copy()
+
+        if cache["keys"].size:
+            found = np.empty(keys.size)
+            pos = np.minimum(np.searchsorted(cache["keys"], keys), cache["keys"].size - 1)
+            hit = cache["keys"][pos] == keys
+            found[hit] = cache["values"][pos[hit]]
+            cache["used"][pos[hit]] = stats["calls"]
+            missing = ~hit
+            misses = int(np.count_nonzero(missing))
+            if misses:
+                found[missing] = evaluate_grid(func, ordered_bits(keys[missing]).view(float))
+                merge(keys[missing], found[missing], np.full(misses, stats["calls"]))
+        else:
+            found = evaluate_grid(func, flat if inverse is None else ordered_bits(keys).view(float))
+            misses = keys.size
+            merge(keys, found, np.full(misses, stats["calls"]))
+        stats["misses"] += misses
+        stats["hits"] += flat.size - misses
+
+        result = found if inverse is None else found[inverse]
+        return result.reshape(values.shape)
+
+    def cache_info():
+        return CacheInfo(stats["hits"], stats["misses"],
+                         None if limit == math.inf else limit,
+                         int(cache["keys"].size) + len(pending))
+
+    def cache_clear():
+        for name in cache:
+            cache[name] = cache[name][:0]
+        pending.clear()
+        index.clear()
+        stats.update(hits=0, misses=0, calls=0)
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+EvalInfo = collections.namedtuple("EvalInfo", ["calls", "samples", "seconds"])
+
+def instrument(func):
+    """
+    Wrap `func` to count its calls and the points it evaluates and to time it. A
+    vectorized call on a grid counts as one call with one sample per grid point.
+    Calls that raise (e.g. a vectorized attempt that falls back to scalars in
+    evaluate_grid) are counted and timed but contribute no samples.
+
+    Nothing is instrumented unless a function is wrapped, so the algorithms
+    themselves carry no overhead. Like cached_integrand, the wrapper has
+    eval_info() and eval_clear().
+
+    Parameters:
+        func (callable): The integrand or function whose root is searched.
+
+    Returns:
+        callable: The counting wrapper, called with the same arguments as `func`.
+    """
+    stats = {"calls": 0, "samples": 0, "nanoseconds": 0}
+
+    @functools.wraps(func)
+    def wrapper(x, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            y = func(x, *args, **kwargs)
+        finally:
+            stats["nanoseconds"] += time.perf_counter_ns() - start
+            stats["calls"] += 1
+        stats["samples"] += np.size(x)
+        return y
+
+    def eval_info():
+        return EvalInfo(stats["calls"], stats["samples"], stats["nanoseconds"] * 1e-9)
+
+    def eval_clear():
+        stats.update(calls=0, samples=0, nanoseconds=0)
+
+    wrapper.eval_info = eval_info
+    wrapper.eval_clear = eval_clear
+    return wrapper
+
+def measure(method, func, *args, **kwargs):
+    """
+    Run `method(func, *args, **kwargs)` with an instrumented `func` and return the
+    result together with the evaluation statistics, so every integrator and root
+    finder of this module reports the same quantities. Native ctypes function
+    pointers run entirely in C and cannot be counted; their counts are None.
+
+    Example:
+        measure(trapezoid, func1, 0.01, 10, 1000)
+        measure(bisection_pure_python, math.sin, 3, 4, tol=1e-10)
+
+    Parameters:
+        method (callable): The algorithm, taking the function as first argument.
+        func (callable): The function passed to the algorithm.
+        *args, **kwargs: The remaining arguments of the algorithm.
+
+    Returns:
+    dict
+        A dictionary containing:
+        - 'result': The unchanged return value of the method.
+        - 'calls': Number of calls of the function.
+        - 'samples': Number of points the function was evaluated at.
+        - 'function_seconds': Time spent inside the function.
+        - 'total_seconds': Wall time of the method.
+        - 'overhead_seconds': Time spent outside the function.
+    """
+    native = isinstance(func, ctypes._CFuncPtr)  # pylint: disable=protected-access
+    counted = func if native else instrument(func)
+    start = time.perf_counter_ns()
+    result = method(counted, *args, **kwargs)
+    total = (time.perf_counter_ns() - start) * 1e-9
+    info = EvalInfo(None, None, None) if native else counted.eval_info()
+    return {
+        "result": result,
+        "calls": info.calls,
+        "samples": info.samples,
+        "function_seconds": info.seconds,
+        "total_seconds": total,
+        "overhead_seconds": None if native else total - info.seconds}
+
+def simpsons_rule(func, a, b, n, substitution=None):
     """
     Approximate the integral of `func` from `a` to `b` using Simpson's Rule.
 
     Parameters:
-        func (callable): The function to integrate.
+        func (callable): The function to integrate. Integrands that accept NumPy
+            arrays are evaluated on the whole grid in one call.
         a (float): The start point of the interval.
         b (float): The end point of the interval.
         n (int): The number of subintervals (must be even).
+        substitution (str or tuple): Optional change of variables, the grid is then
+            uniform in the new variable (see change_of_variables).
 
     Returns:
         float: The approximate integral of the function.
@@ -65,16 +415,18 @@ def simpsons_rule(func, a, b, n):
         raise ValueError("The number of subintervals `n` must be even.")
     if n <= 0:
         raise ValueError("The number of subintervals `n` must be positive.")
+    if substitution is not None:
+        func, a, b = substituted_integrand(func, a, b, substitution)
 
     h = (b - a) / n
-    x = [a + i * h for i in range(n + 1)]
-    y = [func(xi) for xi in x]
+    x = a + np.arange(n + 1) * h
+    y = evaluate_grid(func, x)
 
     integral = y[0] + y[-1]
-    integral += 4 * sum(y[i] for i in range(1, n, 2))
-    integral += 2 * sum(y[i] for i in range(2, n - 1, 2))
+    integral += 4 * np.sum(y[1:n:2])
+    integral += 2 * np.sum(y[2:n - 1:2])
     integral *= h / 3
-    return integral
+    return float(integral)
 
 # Function that uses the tangent method for root-finding
 def root_tangent(function, fprime, x0):
@@ -91,6 +443,7 @@ def root_tangent(function, fprime, x0):
     Outputs:
     (number): the desired root (zero) of the function
     """
+    from scipy import optimize  # pylint: disable=import-outside-toplevel
     return optimize.newton(function, x0, fprime)
 
 def tangent_pure_python(func, fprime, x0, tol=1e-6, maxiter=50):
@@ -147,6 +500,68 @@ def tangent_pure_python(func, fprime, x0, tol=1e-6, maxiter=50):
         "iterations": maxiter,
         "message": "Maximum iterations reached without convergence."}
 
+# Result of the array root finders: one record per lane
+ROOT_DTYPE = np.dtype([("root", float), ("converged", bool), ("iterations", np.int64)])
+
+def tangent_many(func, fprime, x0, params=(), tol=1e-6, maxiter=50):
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    """
+    Newton-Raphson (tangent) method for many initial guesses and/or parameter values
+    at once, e.g. to polish candidate roots found by a scan.
+
+    The initial guesses, parameters and tolerances are broadcast against each other
+    and every combination is one lane. Each iteration evaluates `func` and `fprime`
+    once on the lanes that are still active. As in tangent_pure_python, a lane stops
+    when the Newton step is smaller than its tolerance (converged) or when the
+    derivative is too close to zero; lanes whose step is not finite stop as well.
+
+    Parameters:
+        func (callable): Called as func(x, *params) with x a 1-D array and every
+            parameter as a 1-D array of the same length.
+        fprime (callable): The derivative of func, called the same way.
+        x0 (float or np.ndarray): Initial guesses.
+        params (tuple): Numbers or arrays passed after x. A single array may be
+            passed instead of a tuple.
+        tol (float or np.ndarray): Convergence tolerance per lane. Defaults to 1e-6.
+        maxiter (int): Maximum number of iterations. Defaults to 50.
+
+    Returns:
+        np.ndarray: Structured array of ROOT_DTYPE with the broadcast shape of x0,
+        params and tol: the root (NaN if not converged), whether the lane converged
+        and its number of iterations.
+    """
+    if not isinstance(params, tuple):
+        params = (params,)
+    lanes = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x0, tol, *params)))
+    shape = lanes[0].shape
+    x, tol, *params = (lane.ravel() for lane in lanes)
+
+    result = np.zeros(x.size, dtype=ROOT_DTYPE)
+    result["root"] = np.nan
+    result["iterations"] = maxiter
+
+    # state of the active lanes, compressed whenever lanes stop
+    index = np.arange(x.size)
+    state = [x, tol] + params
+    for i in range(maxiter):
+        x, tol, *params = state
+        with np.errstate(all="ignore"):
+            f_val = np.broadcast_to(np.asarray(func(x, *params), dtype=float), x.shape)
+            fprime_val = np.broadcast_to(np.asarray(fprime(x, *params), dtype=float), x.shape)
+            flat = np.abs(fprime_val) < 1e-12
+            x_next = x - f_val / np.where(flat, 1.0, fprime_val)
+        converged = ~flat & (np.abs(x_next - x) < tol)
+        stop = flat | converged | ~np.isfinite(x_next)
+        result["converged"][index[converged]] = True
+        result["root"][index[converged]] = x_next[converged]
+        result["iterations"][index[stop]] = np.where(flat, i, i + 1)[stop]
+
+        index = index[~stop]
+        if index.size == 0:
+            break
+        state = [x_next[~stop], tol[~stop]] + [p[~stop] for p in params]
+    return result.reshape(shape)
+
 def a_trap(y, d):
     """
     trap takes in y as an array of y values
@@ -181,6 +596,9 @@ def func2(x):
     return np.cos(1/x)
 
 
+#largest number of refined points adapt() evaluates in a single call
+CHUNK_SAMPLES=2**22
+
 def sec_derivative(func, x,dx):
     """
     This function takes the second derivative of a function
@@ -209,23 +627,299 @@ def adapt(func, bounds, d, sens):
     dx=x[1]-x[0]
     d2ydx2=sec_derivative(func,x,dx)
 
-    loopx=enumerate(x)
+    #each second derivative defines the number of points used
+    #between two neighbouring x values
+    scaled=np.abs(sens*d2ydx2[:-1])
+    if not np.all(np.isfinite(scaled)):
+        raise ValueError("The second derivative of the function is not finite on the grid.")
+    counts=2*(scaled.astype(np.int64)+1)
+
+    #the refined cells are processed in chunks of consecutive cells
+    #holding at most CHUNK_SAMPLES points to keep the memory bounded
+    bounds_idx=np.searchsorted(np.cumsum(counts), np.arange(1, counts.sum()//CHUNK_SAMPLES+1)
+                               *CHUNK_SAMPLES, side="right")
+    edges=np.unique(np.concatenate(([0], bounds_idx, [len(counts)])))
     summer=0
-    #a loop is run through x. Each second derivative is used to
-    #define the number of indices of new_x, which is a
-    #list defining a number of points inbetween 2 x values
-    #then, trapezoidal integration is conducted over new_x
-    #and each integration is summed with eachother to produce
-    #the total integral.
-    for count, val in loopx:
-        if count!=len(x)-1:
-            new_x=np.linspace(val, x[count+1], 2*(int(np.abs(sens*d2ydx2[count]))+1))
-            new_y=func(new_x)
-            summer+=a_trap(new_y, dx/((2*(int(np.abs(sens*d2ydx2[count]))+1))-1))
+    for first, last in zip(edges[:-1], edges[1:]):
+        summer+=ragged_trapezoid(func, x[first:last+1], counts[first:last])*dx
     return summer
 
+def ragged_trapezoid(func, x, counts):
+    """
+    ragged_trapezoid integrates func with the trapezoidal rule
+    over the cells [x[i], x[i+1]], using counts[i] equally
+    spaced points in cell i. All cells are concatenated into
+    one ragged grid so func is evaluated a single time, and
+    each cell is reduced with a segment sum. The result is
+    in units of the cell width, the caller multiplies by it.
+    """
+    #within each cell the points are spaced exactly like
+    #np.linspace(x[i], x[i+1], counts[i])
+    starts=np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ends=starts+counts-1
+    local=np.arange(ends[-1]+1)-np.repeat(starts, counts)
+    new_x=np.repeat(x[:-1], counts)+local*np.repeat((x[1:]-x[:-1])/(counts-1), counts)
+    new_x[ends]=x[1:]
+    new_y=func(new_x)
+
+    #trapezoidal integration of every cell with segment sums, the cells
+    #are summed with eachother to produce the total integral.
+    cells=np.add.reduceat(new_y, starts)-(new_y[starts]+new_y[ends])/2
+    return np.sum(cells/(counts-1))
+
+
+def integrate_many(func, bounds, params=(), method="trapezoid", n=1000):
+    """
+    Integrate one function family over many intervals and/or parameter values at once.
+
+    The lower bounds, upper bounds and parameters are broadcast against each other and
+    every combination is one integral. The samples are laid out on a 2-D grid with one
+    row per integral, and `func` is evaluated once per chunk of rows holding at most
+    CHUNK_SAMPLES points, so memory stays bounded for any number of integrals.
+
+    Parameters:
+        func (callable): The function to integrate, called as func(x, *params) with
+            x of shape (rows, n + 1) and each parameter of shape (rows, 1).
+        bounds (tuple): (a, b), lower and upper bounds as numbers or arrays.
+        params (tuple): Numbers or arrays passed to `func` after x. A single array
+            may be passed instead of a tuple.
+        method (str): "trapezoid" (default) or "simpson".
+        n (int): The number of subintervals of every integral (even for "simpson").
+
+    Returns:
+        np.ndarray: The integrals, with the broadcast shape of a, b and params.
+    """
+    if method not in ("trapezoid", "simpson"):
+        raise ValueError(f"Unknown method '{method}', use 'trapezoid' or 'simpson'.")
+    if n <= 0 or (method == "simpson" and n % 2 != 0):
+        raise ValueError("The number of subintervals `n` must be positive (and even for simpson).")
+    if not isinstance(params, tuple):
+        params = (params,)
+
+    # weights of the rule for unit spacing, scaled by the step size of each row
+    weights = np.ones(n + 1)
+    if method == "trapezoid":
+        weights[[0, -1]] = 0.5
+    else:
+        weights[1:-1:2], weights[2:-1:2] = 4, 2
+        weights /= 3
+
+    lanes = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (*bounds, *params)))
+    shape = lanes[0].shape
+    lanes = [lane.ravel() for lane in lanes]
+    h = (lanes[1] - lanes[0]) / n
+    results = np.empty(h.shape)
+    rows = max(1, CHUNK_SAMPLES // (n + 1))
+    for first in range(0, len(h), rows):
+        chunk = slice(first, first + rows)
+        x = lanes[0][chunk, None] + np.arange(n + 1) * h[chunk, None]
+        y = func(x, *(lane[chunk, None] for lane in lanes[2:]))
+        results[chunk] = np.broadcast_to(y, x.shape) @ weights * h[chunk]
+    return results.reshape(shape)
+
+def sample_with_singularities(func, l_lim, u_lim, steps, policy="nudge"):
+    '''
+    This function samples the input function on a linear grid between the limits
+    and handles points where the integrand is infinite or undefined. The function is
+    evaluated once on the whole grid, the non-finite samples are found with a mask and
+    only those points are patched according to the policy.
+
+    Parameters:
+    - func: integrand (must accept a numpy array)
+    - l_lim: lower limit of integration
+    - u_lim: upper limit of integration
+    - steps: number of steps
+    - policy: "nudge" moves each non-finite point by 1e-9 into the interval and
+      evaluates it again, "exclude" drops the non-finite points from the grid
+
+    Returns:
+    - dictionary containing:
+        - 'x': the (patched) grid
+        - 'y': the function values on the grid
+        - 'patched': the number of grid points that were nudged or excluded
+    '''
+    if policy not in ("nudge", "exclude"):
+        raise ValueError(f"Unknown singularity policy '{policy}', use 'nudge' or 'exclude'.")
+
+    x = np.linspace(l_lim, u_lim, steps+1)  # create a linear grid between upper and lower limit
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        y = np.asarray(func(x), dtype=float)
+        bad = ~np.isfinite(y)   # mask of the points where the integrand is infinite
+        patched = int(np.count_nonzero(bad))
+        if patched and policy == "nudge":
+            # move the singular points slightly, the upper limit is moved inwards
+            shift = np.full(patched, 0.000000001)
+            shift[np.flatnonzero(bad) == steps] *= -1
+            x[bad] += shift
+            y[bad] = func(x[bad])
+        elif patched:
+            x, y = x[~bad], y[~bad]
+    return {"x": x, "y": y, "patched": patched}
+
+def cumulative_integral(y, x=None, dx=1.0, method="trapezoid", every=1):
+    '''
+    This function calculates the running integral of sampled function values in one
+    O(n) pass, i.e. the integral from the first sample to every other sample.
+
+    Parameters:
+    - y: function values
+    - x: sample points (optional, default is equal spacing dx)
+    - dx: spacing of the samples if x is not given (default value 1.0)
+    - method: "trapezoid" (default) or "simpson". Simpson needs equally spaced samples;
+      each interval is integrated with the parabola through its neighbours, so the
+      running integral at every even index equals the composite Simpson's rule
+    - every: return only every k-th point of the running integral, e.g. for plotting
+
+    Returns:
+    - array of the running integral (starting with 0) at the points x[::every]
+    '''
+    y = np.asarray(y, dtype=float)
+    if method not in ("trapezoid", "simpson"):
+        raise ValueError(f"Unknown method '{method}', use 'trapezoid' or 'simpson'.")
+    if y.ndim != 1 or len(y) < 1:
+        raise ValueError("The samples `y` must be a one-dimensional array of at least one value.")
+    if x is not None and np.shape(x) != y.shape:
+        raise ValueError(f"`x` has {np.size(x)} points but `y` has {len(y)} samples.")
+    if every < 1:
+        raise ValueError("`every` must be at least 1.")
+    h = np.full(len(y) - 1, float(dx)) if x is None else np.diff(np.asarray(x, dtype=float))
+
+    if method == "trapezoid" or len(y) < 3:
+        parts = h * (y[:-1] + y[1:]) / 2
+    else:
+        if not np.allclose(h, h[0], rtol=1e-6):
+            raise ValueError("The simpson method needs equally spaced samples.")
+        # parabola through the interval and its right neighbour, for odd intervals
+        # and for the last interval through the interval and its left neighbour
+        forward = (5 * y[:-2] + 8 * y[1:-1] - y[2:]) * h[:-1] / 12
+        backward = (-y[:-2] + 8 * y[1:-1] + 5 * y[2:]) * h[1:] / 12
+        parts = np.empty(len(y) - 1)
+        parts[:-1:2] = forward[::2]
+        parts[1::2] = backward[::2]
+        if len(parts) % 2 == 1:
+            parts[-1] = backward[-1]
+
+    running = np.concatenate(([0.0], np.cumsum(parts)))
+    return running[::every]
+
+def trapezoid_cumulative(func, l_lim, u_lim, steps=10000, every=1):
+    '''
+    This function calculates the running integral of the input function between the
+    limits with the trapezoidal rule in one O(n) pass, for plotting the integral curve.
+    Infinite points are handled like in trapezoid_numpy().
+
+    Parameters:
+    - func: integrand (could be a custom defined function or a standard function like np.sin)
+    - l_lim: lower limit of integration
+    - u_lim: upper limit of integration
+    - steps: number of steps (default value 10000)
+    - every: return only every k-th point (default value 1)
+
+    Returns:
+    - tuple of the grid points x[::every] and the running integral at those points,
+      the last value is the integral over the whole interval
+    '''
+    samples = sample_with_singularities(func, l_lim, u_lim, steps)
+    running = cumulative_integral(samples["y"], samples["x"], every=every)
+    return samples["x"][::every], running
+
+def sample_chunks(source, chunk_size=2**20):
+    '''
+    This function turns a source of sampled data into an iterator of (x, y) chunks.
+
+    Parameters:
+    - source: one of
+        - an iterable of (x, y) array pairs (e.g. a generator reading a sensor trace)
+        - a path to a .npy file holding an (N, 2) array of x, y rows, opened as np.memmap
+        - a path to any other file holding raw float64 x, y pairs, opened as np.memmap
+        - an (N, 2) array of x, y rows
+    - chunk_size: number of samples per chunk for files and arrays (default value 2**20)
 
-def trapezoid_numpy(func, l_lim, u_lim, steps=10000):
+    Returns:
+    - iterator of (x, y) array pairs
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        if os.fspath(source).endswith(".npy"):
+            source = np.load(source, mmap_mode="r")
+        else:
+            source = np.memmap(source, dtype=np.float64, mode="r").reshape(-1, 2)
+    if isinstance(source, np.ndarray):
+        if source.ndim != 2 or source.shape[1] != 2:
+            raise ValueError("Sampled data must be an (N, 2) array of x, y rows.")
+        return ((source[i:i+chunk_size, 0], source[i:i+chunk_size, 1])
+                for i in range(0, len(source), chunk_size))
+    return iter(source)
+
+def simpson_pairs(x, y):
+    '''
+    This function applies Simpson's rule to consecutive pairs of intervals
+    (x[0], x[1], x[2]), (x[2], x[3], x[4]), ... of possibly unequally spaced samples.
+
+    Parameters:
+    - x: sample points, an odd number of them
+    - y: function values
+
+    Returns:
+    - sum of the Simpson integrals of all pairs
+    '''
+    h0 = x[1:-1:2] - x[:-2:2]
+    h1 = x[2::2] - x[1:-1:2]
+    return np.sum((h0 + h1) / 6 * ((2 - h1 / h0) * y[:-2:2]
+                                   + (h0 + h1) ** 2 / (h0 * h1) * y[1:-1:2]
+                                   + (2 - h0 / h1) * y[2::2]))
+
+def stream_integrate(source, method="trapezoid", chunk_size=2**20):
+    '''
+    This function integrates sampled data chunk by chunk with constant memory, so traces
+    larger than the memory can be integrated. The last samples of every chunk are carried
+    over to the next one, so the result equals np.trapezoid (method "trapezoid") or
+    scipy.integrate.simpson (method "simpson") on the whole data up to rounding.
+
+    Parameters:
+    - source: sampled data, see sample_chunks() (iterable of (x, y) chunks, .npy file,
+      raw binary file of float64 x, y pairs or (N, 2) array)
+    - method: "trapezoid" (default) or "simpson"
+    - chunk_size: number of samples per chunk read from files and arrays
+
+    Returns:
+    - integral of the sampled data
+    '''
+    if method not in ("trapezoid", "simpson"):
+        raise ValueError(f"Unknown method '{method}', use 'trapezoid' or 'simpson'.")
+
+    partials = []   # integrals of the processed chunks, summed exactly at the end
+    carry_x, carry_y = np.empty(0), np.empty(0)     # samples not integrated yet
+    before = None   # (x, y) of the sample before the carried samples
+    for x, y in sample_chunks(source, chunk_size):
+        x = np.concatenate((carry_x, np.asarray(x, dtype=float)))
+        y = np.concatenate((carry_y, np.asarray(y, dtype=float)))
+        if method == "trapezoid":
+            if len(x) > 1:
+                partials.append(np.sum(np.diff(x) * (y[:-1] + y[1:])) / 2)
+            carry_x, carry_y = x[-1:], y[-1:]
+        else:
+            end = (len(x) - 1) // 2 * 2     # last sample of the complete pairs
+            if end > 0:
+                partials.append(simpson_pairs(x[:end+1], y[:end+1]))
+                before = (x[end-1], y[end-1])
+            carry_x, carry_y = x[end:], y[end:]
+        if len(partials) > 1024:
+            partials = [math.fsum(partials)]
+
+    if method == "simpson" and len(carry_x) == 2:
+        h1 = carry_x[1] - carry_x[0]
+        if before is None:
+            # only two samples in total: trapezoid
+            partials.append(h1 * (carry_y[0] + carry_y[1]) / 2)
+        else:
+            # odd number of intervals: correction for the last interval (Cartwright)
+            h0 = carry_x[0] - before[0]
+            partials.append((2 * h1 ** 2 + 3 * h0 * h1) / (6 * (h0 + h1)) * carry_y[1]
+                            + (h1 ** 2 + 3 * h0 * h1) / (6 * h0) * carry_y[0]
+                            - h1 ** 3 / (6 * h0 * (h0 + h1)) * before[1])
+    return math.fsum(partials)
+
+def trapezoid_numpy(func, l_lim, u_lim, steps=10000, singularity="nudge"):
     '''
     This function implements trapezoidal rule using numpy wrapper function
     by evaluating the integral of the input function over the limits given, and
@@ -238,17 +932,16 @@ def trapezoid_numpy(func, l_lim, u_lim, steps=10000):
     - l_lim: lower limit of integration
     - u_lim: upper limit of integration
     - steps: number of steps (default value 10000)
+    - singularity: policy for points where the integrand is infinite, "nudge"
+      (default) or "exclude", see sample_with_singularities()
 
     Returns:
     - integral of the input function using numpy.trapezoid function
 
     Once the integral value is calculated, it can be compared graphically as follows:
 
-    integral_function = np.zeros(len(x))    # a zero array for integral at each point
-
-    for i in range(1, len(x)):
-        # calculate the integral at each x for plotting
-        integral_function[i] = np.trapezoid(y[:i+1], x[:i+1])
+    # calculate the integral at each x for plotting in one O(n) pass
+    integral_function = cumulative_integral(y, x)
 
     # plotting the original and integrated functions
     plt.plot(x, y, label = '$f(x)$')
@@ -262,32 +955,12 @@ def trapezoid_numpy(func, l_lim, u_lim, steps=10000):
     plt.legend()
     '''
 
-    # check if the integrand is infinite at lower limit, if yes slightly increase the limit
-    try:
-        func(l_lim)
-    except ZeroDivisionError:
-        l_lim += 0.000000001
-
-    # check if the integrand is infinite at upper limit, if yes slightly decrease the limit
-    try:
-        func(u_lim)
-    except ZeroDivisionError:
-        u_lim -= 0.000000001
-
-    x = np.linspace(l_lim, u_lim, steps+1)  # create a linear grid between upper and lower limit
-
-    for i, xi in enumerate((x)):
-        # check if the integrand is infinite at any x, if yes slightly change the x value
-        try:
-            func(xi)
-        except ZeroDivisionError:
-            x[i] += 0.000000001
-
-    y = func(x) # evaluate the function on the modified grid
-    integral_value = np.trapezoid(y, x) # calculate the integral using numpy
+    samples = sample_with_singularities(func, l_lim, u_lim, steps, singularity)
+    # calculate the integral using numpy
+    integral_value = np.trapezoid(samples["y"], samples["x"])
     return integral_value
 
-def trapezoid_scipy(func, l_lim, u_lim, steps=10000):
+def trapezoid_scipy(func, l_lim, u_lim, steps=10000, singularity="nudge"):
     '''
     This function implements trapezoidal rule using scipy wrapper function
     by evaluating the integral of the input function over the limits given, and
@@ -300,17 +973,16 @@ def trapezoid_scipy(func, l_lim, u_lim, steps=10000):
     - l_lim: lower limit of integration
     - u_lim: upper limit of integration
     - steps: number of steps (default value 10000)
+    - singularity: policy for points where the integrand is infinite, "nudge"
+      (default) or "exclude", see sample_with_singularities()
 
     Returns:
     - integral of the input function using scipy.integrate.trapezoid function
 
     Once the integral value is calculated, it can be compared graphically as follows:
 
-       integral_function = np.zeros(len(x))    # a zero array for integral at each point
-
-    for i in range(1, len(x)):
-        # calculate the integral at each x for plotting
-        integral_function[i] = sp.integrate.trapezoid(y[:i+1], x[:i+1])
+    # calculate the integral at each x for plotting in one O(n) pass
+    integral_function = cumulative_integral(y, x)
 
     # plotting the original and integrated functions
     plt.plot(x, y, label = '$f(x)$')
@@ -324,70 +996,580 @@ def trapezoid_scipy(func, l_lim, u_lim, steps=10000):
     plt.legend()
     '''
 
-    # check if the integrand is infinite at lower limit, if yes slightly increase the limit
-    try:
-        func(l_lim)
-    except ZeroDivisionError:
-        l_lim += 0.000000001
-
-    # check if the integrand is infinite at upper limit, if yes slightly decrease the limit
-    try:
-        func(u_lim)
-    except ZeroDivisionError:
-        u_lim -= 0.000000001
-
-    x = np.linspace(l_lim, u_lim, steps+1)  # create a linear grid between upper and lower limit
-
-    for i, xi in enumerate((x)):
-        # check if the integrand is infinite at any x, if yes slightly change the x value
-        try:
-            func(xi)
-        except ZeroDivisionError:
-            x[i] += 0.000000001
-
-    y = func(x)    # evaluate the function on the modified grid
-    integral_value = sp.integrate.trapezoid(y, x)   # calculate the integral using numpy
+    samples = sample_with_singularities(func, l_lim, u_lim, steps, singularity)
+    # calculate the integral using scipy
+    import scipy.integrate  # pylint: disable=import-outside-toplevel
+    integral_value = scipy.integrate.trapezoid(samples["y"], samples["x"])
     return integral_value
 
-def trapezoid(f, a, b, n):
+def trapezoid(f, a, b, n, substitution=None):
     """
     Compute the trapezoidal approximation of an integral.
     Parameters:
-    f (callable): Function to integrate.
+    f (callable): Function to integrate. Integrands that accept NumPy arrays
+        are evaluated on the whole grid in one call.
     a (float): Lower bound of integration.
     b (float): Upper bound of integration.
     n (int): Number of subdivisions.
+    substitution (str or tuple): Optional change of variables, the grid is then uniform
+        in the new variable (see change_of_variables). With "tanh-sinh", exp(-1/x) on
+        [0, 10] and cos(1/x) on [0.01, 3 pi] need a few hundred points for 1e-12.
     """
+    if substitution is not None:
+        f, a, b = substituted_integrand(f, a, b, substitution)
     h = (b - a) / n
-    x = [a + i * h for i in range(n + 1)]
-    y = [f(xi) for xi in x]
-    return (h / 2) * (y[0] + 2 * sum(y[1:-1]) + y[-1])
+    x = a + np.arange(n + 1) * h
+    y = evaluate_grid(f, x)
+    return float((h / 2) * (y[0] + 2 * np.sum(y[1:-1]) + y[-1]))
 
 
-def adaptive_trap_py(f, a, b, tol, remaining_depth=10):
+def trapezoid_levels(f, a, b):
     """
-    Compute an integral using the adaptive trapezoid method.
+    Generate successive trapezoid approximations on nested grids with n = 1, 2, 4, ...
+    subdivisions. Each level only evaluates the new midpoints and reuses the previous
+    level's sum, so the k-th level costs 2**(k-1) new evaluations.
     Parameters:
     f (callable): Function to integrate.
     a (float): Lower bound of integration.
     b (float): Upper bound of integration.
-    tol (float): Tolerance for stopping condition.
-    remaining_depth (int): Remaining recursion depth to avoid infinite recursion.
+    Yields:
+    tuple: (trapezoid approximation, number of subdivisions n, total evaluations so far)
+    """
+    n = 1
+    y = evaluate_grid(f, np.array([a, b], dtype=float))
+    integral = (b - a) / 2 * (y[0] + y[1])
+    evaluations = 2
+    yield integral, n, evaluations
+    while True:
+        h = (b - a) / (2 * n)
+        midpoints = a + (2 * np.arange(n) + 1) * h
+        integral = integral / 2 + h * np.sum(evaluate_grid(f, midpoints))
+        n *= 2
+        evaluations += len(midpoints)
+        yield integral, n, evaluations
+
+# Romberg never stops before this many levels, so a few coincident samples
+# (e.g. of a periodic function) cannot fake convergence
+ROMBERG_MIN_LEVELS = 4
+
+def romberg(f, a, b, tol=1e-10, max_levels=20):
+    """
+    Compute an integral with Romberg integration. Successive trapezoid levels from
+    trapezoid_levels() are combined with Richardson extrapolation until two diagonal
+    entries of the Romberg table agree within the tolerance.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    tol (float): Absolute tolerance for the stopping condition.
+    max_levels (int): Maximum number of trapezoid levels (n = 2**(max_levels - 1)).
+    Returns:
+    dict
+        A dictionary containing:
+        - 'integral': The extrapolated integral.
+        - 'error': The error estimate, difference of the last two diagonal entries.
+        - 'evaluations': The total number of function evaluations.
+        - 'levels': The number of trapezoid levels used.
+        - 'converged': Boolean indicating whether the tolerance was met.
     """
-    integral1 = trapezoid(f, a, b, n=1)
+    levels = trapezoid_levels(f, a, b)
+    row = []
+    error = math.inf
+    level = 0
+    converged = False
+    while not converged and level < max(max_levels, 1):
+        integral, _, evaluations = next(levels)
+        level += 1
+        # Richardson extrapolation of the new trapezoid value against the previous row
+        new_row = [integral]
+        for k, previous in enumerate(row, start=1):
+            new_row.append(new_row[-1] + (new_row[-1] - previous) / (4 ** k - 1))
+        if row:
+            error = abs(new_row[-1] - row[-1])
+        row = new_row
+        converged = bool(level >= ROMBERG_MIN_LEVELS and error < tol)
+    return {
+        "integral": float(row[-1]),
+        "error": float(error),
+        "evaluations": evaluations,
+        "levels": level,
+        "converged": converged}
+
+def integrate_to_tol(f, a, b, rtol=1e-8, atol=1e-12, *, method="trapezoid", max_n=2**20):
+    # pylint: disable=too-many-arguments,too-many-locals
+    """
+    Compute an integral with the trapezoid or Simpson rule, doubling n until the error
+    estimate meets the tolerance. The levels come from trapezoid_levels(), so every
+    doubling only evaluates the new midpoints.
 
-    integral2 = trapezoid(f, a, b, n=2)
+    The error is estimated from the last two levels: |T_2n - T_n| / 3 for the trapezoid
+    rule and |S_2n - S_n| / 15 for Simpson's rule with S_2n = (4 T_2n - T_n) / 3.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    rtol (float): Relative tolerance.
+    atol (float): Absolute tolerance, the target is max(atol, rtol * |integral|).
+    method (str): "trapezoid" or "simpson".
+    max_n (int): Largest number of subdivisions before giving up.
+    Returns:
+    dict
+        A dictionary containing:
+        - 'integral': The approximation of the chosen rule on the final grid.
+        - 'error': The error estimate.
+        - 'n': The final number of subdivisions.
+        - 'evaluations': The total number of function evaluations.
+        - 'converged': Boolean indicating whether the tolerance was met.
+    """
+    if method not in ("trapezoid", "simpson"):
+        raise ValueError(f"Unknown method {method!r}, use 'trapezoid' or 'simpson'.")
+    levels = trapezoid_levels(f, a, b)
+    last_trapezoid = next(levels)[0]
+    previous = last_trapezoid if method == "trapezoid" else None
+    while True:
+        trapezoid_value, n, evaluations = next(levels)
+        integral = trapezoid_value
+        if method == "simpson":
+            integral = (4 * trapezoid_value - last_trapezoid) / 3
+        last_trapezoid = trapezoid_value
+        error = math.inf if previous is None else abs(integral - previous)
+        error /= 3 if method == "trapezoid" else 15
+        # Same minimum number of levels as romberg
+        converged = bool(n >= 2 ** (ROMBERG_MIN_LEVELS - 1)
+                         and error <= max(atol, rtol * abs(integral)))
+        if converged or n >= max_n:
+            break
+        previous = integral
+    return {
+        "integral": float(integral),
+        "error": float(error),
+        "n": n,
+        "evaluations": evaluations,
+        "converged": converged}
+
+@functools.lru_cache(maxsize=None)
+def gauss_legendre_nodes(order):
+    """
+    Compute the nodes and weights of the Gauss-Legendre rule of the given order on [-1, 1]
+    with the Golub-Welsch eigenvalue method. The tables are cached per order, so repeated
+    integrations only pay for the eigenvalue solve once. The returned arrays are read-only.
+    Parameters:
+    order (int): Number of nodes (at least 1).
+    Returns:
+    tuple: (nodes, weights) as NumPy arrays in increasing order of the nodes.
+    """
+    if order < 1:
+        raise ValueError("The order of the Gauss-Legendre rule must be at least 1.")
+    k = np.arange(1, order)
+    beta = k / np.sqrt(4.0 * k ** 2 - 1)
+    nodes, vectors = np.linalg.eigh(np.diag(beta, 1) + np.diag(beta, -1))
+    weights = 2 * vectors[0] ** 2
+    nodes.flags.writeable = False
+    weights.flags.writeable = False
+    return nodes, weights
+
+def gauss_legendre(f, a, b, order=10):
+    """
+    Compute an integral with the fixed-order Gauss-Legendre rule, exact for
+    polynomials up to degree 2 * order - 1.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    order (int): Number of nodes.
+    Returns:
+    float: The approximate integral.
+    """
+    nodes, weights = gauss_legendre_nodes(order)
+    half = (b - a) / 2
+    return float(half * np.sum(weights * evaluate_grid(f, half * nodes + (a + b) / 2)))
+
+# Gauss-Kronrod rules from QUADPACK: non-negative Kronrod nodes (decreasing, ending
+# with 0), their Kronrod weights and the weights of the embedded Gauss nodes, which
+# are every second Kronrod node starting with the second one.
+KRONROD_RULES = {
+    "G7K15": {
+        "nodes": (0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                  0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                  0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                  0.207784955007898467600689403773245, 0.000000000000000000000000000000000),
+        "kronrod": (0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                    0.204432940075298892414161999234649, 0.209482141084727828012999174891714),
+        "gauss": (0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                  0.381830050505118944950369775488975, 0.417959183673469387755102040816327),
+    },
+    "G10K21": {
+        "nodes": (0.995657163025808080735527280689003, 0.973906528517171720077964012084452,
+                  0.930157491355708226001207180059508, 0.865063366688984510732096688423493,
+                  0.780817726586416897063717578345042, 0.679409568299024406234327365114874,
+                  0.562757134668604683339000099272694, 0.433395394129247190799265943165784,
+                  0.294392862701460198131126603103866, 0.148874338981631210884826001129720,
+                  0.000000000000000000000000000000000),
+        "kronrod": (0.011694638867371874278064396062192, 0.032558162307964727478818972459390,
+                    0.054755896574351996031381300244580, 0.075039674810919952767043140916190,
+                    0.093125454583697605535065465083366, 0.109387158802297641899210590325805,
+                    0.123491976262065851077208062590643, 0.134709217311473325928054001771707,
+                    0.142775938577060080797094273138717, 0.147739104901338491374841515972068,
+                    0.149445554002916905664936468389821),
+        "gauss": (0.066671344308688137593568809893332, 0.149451349150580593145776339657697,
+                  0.219086362515982043995534934228163, 0.269266719309996355091226921569469,
+                  0.295524224714752870173892994651938),
+    },
+}
+
+# Maximum number of panels gauss_kronrod() creates before giving up on the tolerance
+GK_MAX_PANELS = 2000
+
+@functools.lru_cache(maxsize=None)
+def kronrod_nodes(rule):
+    """
+    Expand a rule of KRONROD_RULES to full node and weight tables on [-1, 1].
+    The tables are cached per rule and returned read-only.
+    Parameters:
+    rule (str): "G7K15" or "G10K21".
+    Returns:
+    tuple: (nodes, kronrod weights, gauss weights), the gauss weights are zero at the
+    nodes that only belong to the Kronrod rule.
+    """
+    if rule not in KRONROD_RULES:
+        raise ValueError(f"Unknown Gauss-Kronrod rule '{rule}', use one of {list(KRONROD_RULES)}.")
+    table = KRONROD_RULES[rule]
+    half_nodes = np.array(table["nodes"])
+    half_kronrod = np.array(table["kronrod"])
+    half_gauss = np.zeros_like(half_nodes)
+    half_gauss[1::2] = table["gauss"]
+    # mirror the positive nodes, the center node 0 appears once
+    tables = tuple(np.concatenate((half, half[-2::-1])) for half in
+                   (half_nodes, half_kronrod, half_gauss))
+    tables[0][len(half_nodes):] *= -1
+    for table_array in tables:
+        table_array.flags.writeable = False
+    return tables
+
+def kronrod_panels(f, lefts, rights, rule):
+    """
+    Apply a Gauss-Kronrod rule to many panels [lefts[i], rights[i]] with a single
+    evaluation of the integrand on all nodes.
+    Parameters:
+    f (callable): Function to integrate.
+    lefts (np.ndarray): Lower bounds of the panels.
+    rights (np.ndarray): Upper bounds of the panels.
+    rule (str): "G7K15" or "G10K21".
+    Returns:
+    tuple: (Kronrod integrals, error estimates |Kronrod - Gauss|) per panel.
+    """
+    nodes, kronrod, gauss = kronrod_nodes(rule)
+    half = (rights - lefts)[:, None] / 2
+    x = half * nodes + ((lefts + rights) / 2)[:, None]
+    y = evaluate_grid(f, x.ravel()).reshape(x.shape)
+    kronrod_integrals = half[:, 0] * (y @ kronrod)
+    return kronrod_integrals, np.abs(kronrod_integrals - half[:, 0] * (y @ gauss))
+
+def gauss_kronrod(f, a, b, tol=1e-10, rule="G7K15"):
+    """
+    Compute an integral with adaptive Gauss-Kronrod quadrature. The panel with the
+    largest error estimate is bisected until the summed estimate is below the tolerance.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    tol (float): Absolute tolerance for the summed error estimate.
+    rule (str): "G7K15" (default) or "G10K21".
+    Returns:
+    dict
+        A dictionary containing:
+        - 'integral': The approximate integral.
+        - 'error': The summed error estimate of all panels.
+        - 'evaluations': The total number of function evaluations.
+        - 'panels': The number of panels.
+        - 'converged': Boolean indicating whether the tolerance was met.
+    """
+    points = len(kronrod_nodes(rule)[0])
+    integrals, errors = kronrod_panels(f, np.array([a], dtype=float),
+                                       np.array([b], dtype=float), rule)
+    # heap of panels ordered by decreasing error: (-error, left, right, integral)
+    heap = [(-errors[0], a, b, integrals[0])]
+    evaluations = points
+    error = errors[0]
+    while error >= tol and len(heap) < GK_MAX_PANELS:
+        _, left, right, _ = heapq.heappop(heap)
+        mid = (left + right) / 2
+        integrals, errors = kronrod_panels(f, np.array([left, mid]), np.array([mid, right]), rule)
+        evaluations += 2 * points
+        heapq.heappush(heap, (-errors[0], left, mid, integrals[0]))
+        heapq.heappush(heap, (-errors[1], mid, right, integrals[1]))
+        error = math.fsum(-panel[0] for panel in heap)
+    return {
+        "integral": math.fsum(panel[3] for panel in heap),
+        "error": float(error),
+        "evaluations": evaluations,
+        "panels": len(heap),
+        "converged": bool(error < tol)}
 
-    if abs(integral2 - integral1) < tol or remaining_depth <= 0:
-        return integral2
+# Half width of the tanh-sinh parameter range. At |t| = 4 the nodes are about 1e-37
+# (relative) away from the endpoints, which is enough for integrable endpoint singularities.
+TANH_SINH_LIMIT = 4.0
 
+def tanh_sinh_offsets(t, width):
+    """
+    Distance of the tanh-sinh nodes from the nearer endpoint and the Jacobian
+    dx/dt. Both are computed from the logistic function, so the nodes close to an
+    endpoint keep their full relative precision instead of cancelling in 1 - tanh.
+    """
+    u = np.pi / 2 * np.sinh(t)
+    # logistic(z) = 1 / (1 + exp(-z)) without overflow
+    lower = np.exp(-np.logaddexp(0, 2 * np.abs(u)))
+    offset = width * lower
+    jacobian = width * np.pi * np.cosh(t) * lower * (1 - lower)
+    return offset, jacobian
+
+def change_of_variables(substitution, a, b):
+    """
+    Build the substitution x = phi(t) for an integral over [a, b]. The integral becomes
+    the integral of f(phi(t)) * phi'(t) over [t0, t1], where the grid is uniform in t.
+
+    Built-in substitutions:
+        "inverse": x = 1 / t, for integrands that are smooth in 1/x. Requires 0 < a * b.
+        "tanh-sinh": x = (a + b) / 2 + (b - a) / 2 * tanh(pi / 2 * sinh(t)), which
+            clusters the nodes double-exponentially at both endpoints and handles
+            endpoint singularities and endpoint oscillations such as cos(1/x).
+        "exp": x = a + (b - a) * exp(t), which stretches the grid near a. The part of
+            the interval below a + eps * (b - a) is left out.
+
+    Parameters:
+    substitution (str or tuple): Name of a built-in substitution or a tuple
+        (phi, dphi, t0, t1) with the map, its derivative and the limits in t.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    Returns:
+    tuple: (phi, dphi, t0, t1). Points where dphi is 0 are skipped by the integrators.
+    """
+    if not isinstance(substitution, str):
+        phi, dphi, t0, t1 = substitution
+        return phi, dphi, t0, t1
+    if substitution == "inverse":
+        if a * b <= 0:
+            raise ValueError("The substitution x = 1/t requires an interval without 0.")
+        return np.reciprocal, lambda t: 1 / np.square(t), 1 / b, 1 / a
+    if substitution == "tanh-sinh":
+        def tanh_sinh_phi(t):
+            offset = tanh_sinh_offsets(t, b - a)[0]
+            return np.where(t < 0, a + offset, b - offset)
+
+        def tanh_sinh_dphi(t):
+            offset, jacobian = tanh_sinh_offsets(t, b - a)
+            # Nodes that round onto an endpoint are skipped
+            on_endpoint = np.where(t < 0, a + offset == a, b - offset == b)
+            return np.where(on_endpoint, 0.0, jacobian)
+
+        return tanh_sinh_phi, tanh_sinh_dphi, -TANH_SINH_LIMIT, TANH_SINH_LIMIT
+    if substitution == "exp":
+        return (lambda t: a + (b - a) * np.exp(t), lambda t: (b - a) * np.exp(t),
+                math.log(math.ulp(1.0)), 0.0)
+    raise ValueError(f"Unknown substitution {substitution!r}, "
+                     "use 'inverse', 'tanh-sinh', 'exp' or (phi, dphi, t0, t1).")
+
+def substituted_integrand(f, a, b, substitution):
+    """
+    Transform the integral of f over [a, b] with change_of_variables.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    substitution (str or tuple): See change_of_variables.
+    Returns:
+    tuple: (g, t0, t1) with the vectorized integrand g(t) = f(phi(t)) * phi'(t).
+    """
+    phi, dphi, t0, t1 = change_of_variables(substitution, a, b)
+
+    def integrand(t):
+        t = np.asarray(t, dtype=float)
+        jacobian = np.asarray(evaluate_grid(dphi, t.ravel()), dtype=float)
+        used = jacobian != 0
+        y = np.zeros(t.size)
+        y[used] = evaluate_grid(f, evaluate_grid(phi, t.ravel()[used])) * jacobian[used]
+        return y.reshape(t.shape)
+
+    return integrand, t0, t1
+
+def adaptive_trap_stack(f, a, b, tol, max_depth=10):
+    """
+    Compute an integral using the adaptive trapezoid method with an explicit work stack.
+    Every interval carries the function values at its endpoints and midpoint down to
+    its children, so each abscissa is evaluated exactly once.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    tol (float): Tolerance for stopping condition, halved on every split.
+    max_depth (int or None): Maximum number of splits below [a, b]. None lets the
+        error budget alone decide when to stop, down to intervals of one ulp.
+    Returns:
+    dict
+        A dictionary containing:
+        - 'integral': The approximate integral.
+        - 'error': The achieved error estimate, sum of |T2 - T1| / 3 over all intervals.
+        - 'evaluations': The total number of function evaluations.
+        - 'intervals': The number of accepted intervals.
+    """
     mid = (a + b) / 2
-    left_integral = adaptive_trap_py(f, a, mid, tol / 2, remaining_depth - 1)
-    right_integral = adaptive_trap_py(f, mid, b, tol / 2, remaining_depth - 1)
+    fa, fm, fb = f(a), f(mid), f(b)
+    # each entry: (a, b, f(a), f(mid), f(b), tolerance, remaining depth)
+    stack = [(a, b, fa, fm, fb, tol, max_depth)]
+    leaves = []     # (integral, error estimate) of every accepted interval
+    while stack:
+        a, b, fa, fm, fb, tol, depth = stack.pop()
+        integral1 = (b - a) / 2 * (fa + fb)
+        integral2 = (b - a) / 4 * (fa + 2 * fm + fb)
+        difference = abs(integral2 - integral1)
+        mid = (a + b) / 2
+        # intervals of one ulp cannot be split and non-finite differences never
+        # meet the tolerance, accept both so max_depth=None always terminates
+        if (difference < tol or (depth is not None and depth <= 0)
+                or not (math.isfinite(difference) and a < mid < b)):
+            leaves.append((integral2, difference / 3))
+            continue
+
+        depth = None if depth is None else depth - 1
+        # push the right half first so the left half is processed first
+        stack.append((mid, b, fm, f((mid + b) / 2), fb, tol / 2, depth))
+        stack.append((a, mid, fa, f((a + mid) / 2), fm, tol / 2, depth))
+
+    return {
+        "integral": math.fsum(leaf[0] for leaf in leaves),
+        "error": math.fsum(leaf[1] for leaf in leaves),
+        # three points for [a, b] and two new points for every split
+        "evaluations": 2 * len(leaves) + 1,
+        "intervals": len(leaves)}
+
+# Estimated serial evaluation time (seconds) below which parallel_integrate stays serial
+PARALLEL_MIN_SECONDS = 0.5
+
+def fill_shared_panel(task):
+    """
+    Evaluate one panel of the grid a + i * h, start <= i < stop, and write the samples into
+    the shared memory block holding all samples. Runs in the worker processes of
+    parallel_integrate().
+    Parameters:
+    task (tuple): (shared memory name, number of grid points, f, a, h, start, stop)
+    """
+    name, size, f, a, h, start, stop = task
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        samples = np.ndarray((size,), dtype=float, buffer=block.buf)
+        samples[start:stop] = evaluate_grid(f, a + np.arange(start, stop) * h)
+    finally:
+        block.close()
+
+def pairwise_sum(values):
+    """
+    Sum values by recursive halving in a fixed order, so the rounding only depends on
+    the values and not on how they were computed.
+    Parameters:
+    values (sequence of float): Values to sum.
+    """
+    if len(values) <= 2:
+        return sum(values, 0.0)
+    half = len(values) // 2
+    return pairwise_sum(values[:half]) + pairwise_sum(values[half:])
+
+def parallel_integrate(f, bounds, n, method="trapezoid", *, workers=None, chunk_size=10000):
+    # pylint: disable=too-many-arguments
+    """
+    Compute a trapezoid or Simpson integral of an expensive scalar integrand on a pool of
+    worker processes. The grid a + i * h is split into panels of chunk_size points, the
+    workers evaluate the panels into one shared memory block, and the weighted panel sums
+    are combined pairwise in a fixed order. The result is therefore bit-for-bit the same
+    for every worker count, including the serial fallback, which is used when workers is 1,
+    when f cannot be sent to other processes (e.g. lambdas), or when a few probe calls
+    estimate the whole grid at less than PARALLEL_MIN_SECONDS.
+    Parameters:
+    f (callable): Function to integrate, must be picklable to run in parallel.
+    bounds (tuple): (a, b) lower and upper bound of integration.
+    n (int): Number of subdivisions (even for simpson).
+    method (str): "trapezoid" (default) or "simpson".
+    workers (int or None): Number of worker processes, None for the number of CPUs.
+    chunk_size (int): Number of grid points per panel.
+    Returns:
+    float: The approximate integral.
+    """
+    if method not in ("trapezoid", "simpson"):
+        raise ValueError(f"Unknown method '{method}', use 'trapezoid' or 'simpson'.")
+    if n <= 0 or (method == "simpson" and n % 2 != 0):
+        raise ValueError("The number of subintervals `n` must be positive (and even for simpson).")
+    h = (bounds[1] - bounds[0]) / n
+    panels = [(start, min(start + chunk_size, n + 1)) for start in range(0, n + 1, chunk_size)]
+    parallel = workers != 1 and len(panels) > 1 and worth_parallel(f, bounds, n)
+
+    # the pool is only started once the shared block exists, so it is always shut down
+    block = shared_memory.SharedMemory(create=True, size=8 * (n + 1))
+    try:
+        tasks = [(block.name, n + 1, f, bounds[0], h, start, stop) for start, stop in panels]
+        if parallel:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(fill_shared_panel, tasks))
+        else:
+            list(map(fill_shared_panel, tasks))
+        samples = np.ndarray((n + 1,), dtype=float, buffer=block.buf)
+        partials = [float(panel_weights(start, stop, n, method) @ samples[start:stop])
+                    for start, stop in panels]
+        del samples
+    finally:
+        block.close()
+        block.unlink()
+    return pairwise_sum(partials) * h
+
+def panel_weights(start, stop, n, method):
+    """
+    Weights of the grid points start <= i < stop of a trapezoid or Simpson rule with n
+    subdivisions, for unit step size.
+    Parameters:
+    start (int): First grid index of the panel.
+    stop (int): Grid index after the last one of the panel.
+    n (int): Number of subdivisions of the whole grid.
+    method (str): "trapezoid" or "simpson".
+    """
+    index = np.arange(start, stop)
+    ends = (index == 0) | (index == n)
+    if method == "trapezoid":
+        return np.where(ends, 0.5, 1.0)
+    return np.where(ends, 1, 2 + 2 * (index % 2)) / 3
+
+def worth_parallel(f, bounds, n):
+    """
+    Decide whether evaluating f on n + 1 points is worth a process pool: f must be
+    picklable, and three probe calls must estimate the serial evaluation at no less
+    than PARALLEL_MIN_SECONDS.
+    Parameters:
+    f (callable): The integrand.
+    bounds (tuple): (a, b) lower and upper bound of integration.
+    n (int): Number of subdivisions.
+    """
+    try:
+        pickle.dumps(f)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    start_time = time.perf_counter()
+    for xi in (bounds[0], (bounds[0] + bounds[1]) / 2, bounds[1]):
+        f(xi)
+    return (time.perf_counter() - start_time) / 3 * (n + 1) >= PARALLEL_MIN_SECONDS
 
-    return left_integral + right_integral
+def adaptive_trap_py(f, a, b, tol, remaining_depth=10):
+    """
+    Compute an integral using the adaptive trapezoid method.
+    Parameters:
+    f (callable): Function to integrate.
+    a (float): Lower bound of integration.
+    b (float): Upper bound of integration.
+    tol (float): Tolerance for stopping condition.
+    remaining_depth (int or None): Maximum refinement depth, None for no limit.
+    Use adaptive_trap_stack() to also get the error estimate and evaluation count.
+    """
+    return adaptive_trap_stack(f, a, b, tol, remaining_depth)["integral"]
 
-def trapezoid_python(func, l_lim, u_lim, steps=10000):
+def trapezoid_python(func, l_lim, u_lim, steps=10000, singularity="nudge"):
     '''
     This function implements trapezoidal rule by a pure python implementation
     by evaluating the integral of the input function over the limits given, and
@@ -400,6 +1582,8 @@ def trapezoid_python(func, l_lim, u_lim, steps=10000):
     - l_lim: lower limit of integration
     - u_lim: upper limit of integration
     - steps: number of steps (default value 10000)
+    - singularity: policy for points where the integrand is infinite, "nudge"
+      (default) or "exclude", see sample_with_singularities()
 
     Returns:
     - integral of the input function using numpy.trapezoid function
@@ -408,31 +1592,11 @@ def trapezoid_python(func, l_lim, u_lim, steps=10000):
     or trapezoid_scipy()
     '''
 
-    # check if the integrand is infinite at lower limit, if yes slightly increase the limit
-    try:
-        func(l_lim)
-    except ZeroDivisionError:
-        l_lim += 0.000000001
-
-    # check if the integrand is infinite at upper limit, if yes slightly decrease the limit
-    try:
-        func(u_lim)
-    except ZeroDivisionError:
-        u_lim -= 0.000000001
-
-    x = np.linspace(l_lim, u_lim, steps+1)  # create a linear grid between upper and lower limit
-
-    for i, xi in enumerate((x)):
-        # check if the integrand is infinite at any x, if yes slightly change the x value
-        try:
-            func(xi)
-        except ZeroDivisionError:
-            x[i] += 0.000000001
-
-    y = func(x) # evaluate the function on the modified grid
-    h = (u_lim - l_lim)/steps   # step size
+    samples = sample_with_singularities(func, l_lim, u_lim, steps, singularity)
+    x, y = samples["x"], samples["y"]
+    h = np.diff(x)   # step sizes (uniform unless points were excluded)
     # calculate the integral using the trapezoidal algorithm
-    integral_value = (h/2)*(y[0] + y[-1] + 2 * np.sum(y[1:-1]))
+    integral_value = np.sum(h * (y[:-1] + y[1:])) / 2
     return integral_value
 
 def secant_wrapper(func, x0, x1, args=(), maxiter=50):
@@ -455,6 +1619,7 @@ def secant_wrapper(func, x0, x1, args=(), maxiter=50):
     """
 
     #Use the secant method
+    from scipy import optimize  # pylint: disable=import-outside-toplevel
     res = optimize.root_scalar(
         func,
         args=args,
@@ -500,6 +1665,7 @@ def bisection_wrapper(func, a, b, tol=1e-6, max_iter=1000):
             raise ValueError(f"Singularity detected: division by zero in function at x = {b}.")
 
         # Call the SciPy bisect method if no errors were raised
+        from scipy import optimize  # pylint: disable=import-outside-toplevel
         root = optimize.bisect(func, a, b, xtol=tol, maxiter=max_iter)
 
     except ValueError as e:
@@ -563,6 +1729,85 @@ def bisection_pure_python(func, a, b, tol=1e-6, max_iter=1000):
 
     return root
 
+def bisection_many(func, a, b, params=(), tol=1e-6, max_iter=1000):
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    """
+    Bisection method for many brackets and/or parameter values at once.
+
+    The brackets and parameters are broadcast against each other and every
+    combination is one lane. Each iteration evaluates `func` once on the midpoints of
+    the lanes that are still active. Lanes that converged, hit an exact zero or have
+    no sign change are masked out of the active set, so 10^5 brackets cost about
+    log2((b - a) / tol) array evaluations instead of millions of Python calls.
+
+    Like bisection_pure_python, a bracket around a pole (e.g. of 1/sin(x)) converges
+    to the pole. Lanes whose function value is not finite stop without converging.
+
+    Parameters:
+        func (callable): Called as func(x, *params) with x a 1-D array of midpoints
+            and every parameter as a 1-D array of the same length.
+        a (float or np.ndarray): Lower ends of the brackets.
+        b (float or np.ndarray): Upper ends of the brackets.
+        params (tuple): Numbers or arrays passed to `func` after x. A single array
+            may be passed instead of a tuple.
+        tol (float): Half width of the final bracket. Defaults to 1e-6.
+        max_iter (int): Maximum number of iterations per lane. Defaults to 1000.
+
+    Returns:
+        np.ndarray: Structured array of ROOT_DTYPE with the broadcast shape of a, b
+        and params: the root (midpoint of the final bracket, NaN if not converged),
+        whether the lane converged and its number of iterations.
+    """
+    if not isinstance(params, tuple):
+        params = (params,)
+    lanes = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, *params)))
+    shape = lanes[0].shape
+    lo, hi, *params = (lane.ravel() for lane in lanes)
+
+    def evaluate(x, args):
+        with np.errstate(all="ignore"):
+            return np.broadcast_to(np.asarray(func(x, *args), dtype=float), x.shape)
+
+    f_lo, f_hi = evaluate(lo, params), evaluate(hi, params)
+    result = np.zeros(lo.size, dtype=ROOT_DTYPE)
+    result["root"] = np.where(f_lo == 0, lo, np.where(f_hi == 0, hi, np.nan))
+    result["converged"] = (f_lo == 0) | (f_hi == 0)
+
+    # state of the active lanes, compressed whenever lanes stop
+    index = np.flatnonzero(~result["converged"] & (np.sign(f_lo) * np.sign(f_hi) < 0))
+    state = [lo[index], hi[index], f_lo[index]] + [p[index] for p in params]
+    iterations = 0
+    while index.size:
+        lo, hi, f_lo, *params = state
+        middle = (lo + hi) / 2
+        # converged, or the bracket cannot shrink any further in floating point
+        converged = (np.abs(hi - lo) / 2 <= tol) | (middle == lo) | (middle == hi)
+        stop = converged | (iterations == max_iter)
+        if stop.any():
+            result["converged"][index[converged]] = True
+            result["root"][index[converged]] = middle[converged]
+            result["iterations"][index[stop]] = iterations
+            index = index[~stop]
+            state = [s[~stop] for s in state]
+            continue
+
+        f_middle = evaluate(middle, params)
+        iterations += 1
+        # keep the half of the bracket with the sign change
+        left = np.sign(f_middle) == np.sign(f_lo)
+        state[:3] = [np.where(left, middle, lo), np.where(left, hi, middle),
+                     np.where(left, f_middle, f_lo)]
+
+        exact, failed = f_middle == 0, ~np.isfinite(f_middle)
+        if exact.any() or failed.any():
+            result["converged"][index[exact]] = True
+            result["root"][index[exact]] = middle[exact]
+            result["iterations"][index[exact | failed]] = iterations
+            keep = ~(exact | failed)
+            index = index[keep]
+            state = [s[keep] for s in state]
+    return result.reshape(shape)
+
 def secant_pure_python(func, x0, x1, args=(), maxiter=50):
     """
     Pure Python method for the secant method of root finding.
@@ -620,33 +1865,23 @@ def ctypes_stub():
     2. calculate_square: Computes the square of a number if it is non-negative, returning
     NAN for invalid input.
     """
-    # Load the DLL
-    dll = ctypes.CDLL("./lib_calculus.so")
-
-
-    # Define function signatures
-    dll.verify_arguments.argtypes = [ctypes.c_double]
-    dll.verify_arguments.restype = ctypes.c_bool
-
-    dll.calculate_square.argtypes = [ctypes.c_double]
-    dll.calculate_square.restype = ctypes.c_double
-
-    # Test the functions
+    # Test the functions of the DLL, loaded with their signatures by native_backend
     try:
         # Test valid input
-        result = dll.calculate_square(4.0)
+        result = native_backend.function("calculate_square")(4.0)
         print(f"Square of 4.0: {result}")  # Should print 16.0
 
         # Test invalid input
-        result = dll.calculate_square(-4.0)
+        result = native_backend.function("calculate_square")(-4.0)
         if math.isnan(result):
             print("Square of -4.0: Invalid input (returned NAN)")
         else:
             print(f"Square of -4.0: {result}")
 
         # Verify arguments
-        print(f"verify_arguments(4.0): {dll.verify_arguments(4.0)}")  # True
-        print(f"verify_arguments(-4.0): {dll.verify_arguments(-4.0)}")  # False
+        verify_arguments = native_backend.function("verify_arguments")
+        print(f"verify_arguments(4.0): {verify_arguments(4.0)}")  # True
+        print(f"verify_arguments(-4.0): {verify_arguments(-4.0)}")  # False
 
     except OSError as e:
         # Specific exception for issues loading the DLL or accessing its symbols
@@ -660,37 +1895,158 @@ def ctypes_stub():
         # Exception for type mismatch errors
         print(f"Type error: {e}")
 
+# Ids of the compiled functions in the native function registry of lib_calculus.so
+NATIVE_FUNCTIONS = {
+    "exp(-1/x)": 0,
+    "cos(1/x)": 1,
+    "polynomial": 2,
+    "tanh(x)": 3,
+    "sin(x)": 4,
+    "1/sin(x)": 5,
+}
+
+# Ids of the polynomials registered in lib_calculus.so by this process, by coefficients
+_polynomials = {}
+
+def native_polynomial(coefficients):
+    """
+    Registers a polynomial in lib_calculus.so and returns its id, which can be used
+    wherever a name of NATIVE_FUNCTIONS is accepted. Every polynomial has its own id
+    and function, so registering another one does not change earlier ids or function
+    pointers. Equal coefficients share an id. Ids are only valid in this process.
+
+    Parameters:
+        coefficients (sequence of float): Coefficients of the polynomial, lowest order
+            first (x^3 + 1 is [1, 0, 0, 1]).
+
+    Returns:
+        int: The id of the polynomial.
+
+    Raises:
+        ValueError: If there are no coefficients or all polynomial slots are taken.
+    """
+    key = tuple(float(c) for c in coefficients)
+    if not key:
+        raise ValueError("The native polynomial needs at least one coefficient.")
+    if key not in _polynomials:
+        values = (ctypes.c_double * len(key))(*key)
+        func_id = native_backend.function("polynomial_handle")(values, len(key))
+        if func_id < 0:
+            raise ValueError("lib_calculus.so has no free polynomial slot, "
+                             f"{len(_polynomials)} polynomials are registered.")
+        _polynomials[key] = func_id
+    return _polynomials[key]
+
+def native_id(name):
+    """
+    Id of a name or id of NATIVE_FUNCTIONS or of a polynomial from native_polynomial().
+
+    Raises:
+        ValueError: If the function is unknown, or is "polynomial" without coefficients.
+    """
+    func_id = NATIVE_FUNCTIONS.get(name, name)
+    if func_id == NATIVE_FUNCTIONS["polynomial"]:
+        raise ValueError("The native polynomial needs coefficients, "
+                         "use the id returned by native_polynomial().")
+    if func_id not in NATIVE_FUNCTIONS.values() and func_id not in _polynomials.values():
+        raise ValueError(f"Unknown native function {name!r}, use one of {list(NATIVE_FUNCTIONS)}.")
+    return func_id
+
+def native_integrand(name, coefficients=None):
+    """
+    Looks up a compiled function in the native function registry of lib_calculus.so.
+    The returned ctypes function pointer can be passed instead of a Python callback to
+    ctypes_invoke_with_floats, secant_root and adapt_c, which then run entirely in C.
+
+    Parameters:
+        name (str or int): A key of NATIVE_FUNCTIONS, the numeric id or an id from
+            native_polynomial().
+        coefficients (sequence of float): Coefficients of the polynomial, lowest order
+            first (x^3 + 1 is [1, 0, 0, 1]). Required for "polynomial", registered
+            with native_polynomial().
+
+    Returns:
+        ctypes function pointer: The native function with signature double(double).
+
+    Raises:
+        ValueError: If the name or id is unknown or the polynomial has no coefficients.
+    """
+    polynomial = NATIVE_FUNCTIONS.get(name, name) == NATIVE_FUNCTIONS["polynomial"]
+    if polynomial and coefficients is not None:
+        func_id = native_polynomial(coefficients)
+    else:
+        func_id = native_id(name)
+    return native_backend.function("native_function")(func_id)
+
+def integrate_native(func, bounds, n=10000, method="trapezoid", threads=0):
+    """
+    Integrates with the OpenMP kernels of lib_calculus.so. The whole rule runs in C
+    without the GIL, so threads from the pool do the work instead of Python.
+
+    The integrand is either a compiled function from NATIVE_FUNCTIONS, evaluated
+    on n subdivisions, or a NumPy array of equally spaced samples over bounds. The
+    array is read in place when it is already a contiguous float64 array.
+
+    Parameters:
+        func (str, int or numpy.ndarray): Name or id of a native function, or samples.
+            Polynomials are passed as the id returned by native_polynomial().
+        bounds (tuple of float): Lower and upper limit of integration.
+        n (int): Number of subdivisions, ignored for samples. Even for "simpson".
+        method (str): "trapezoid" or "simpson".
+        threads (int): Number of OpenMP threads, 0 for the OpenMP default.
+
+    Returns:
+        float: The approximate integral.
+
+    Raises:
+        ValueError: If the method, function or number of points is invalid.
+    """
+    if method not in ("trapezoid", "simpson"):
+        raise ValueError(f"Unknown method {method!r}, use 'trapezoid' or 'simpson'.")
+
+    a, b = bounds
+
+    if isinstance(func, np.ndarray):
+        samples = np.ascontiguousarray(func, dtype=np.float64)
+        if samples.ndim != 1:
+            raise ValueError("The samples must be a one-dimensional array.")
+        if method == "simpson" and samples.size % 2 == 0:
+            raise ValueError("Simpson's rule needs an odd number of samples.")
+        if samples.size < 2:
+            raise ValueError("At least two samples are required.")
+        kernel = native_backend.function(f"{method}_samples")
+        return kernel(samples, samples.size, (b - a) / (samples.size - 1), threads)
+
+    func_id = native_id(func)
+    if n < 1 or (method == "simpson" and n % 2 != 0):
+        raise ValueError("The number of subdivisions must be positive, and even for Simpson.")
+    kernel = native_backend.function(f"{method}_native")
+    return kernel(func_id, a, b, n, threads)
+
 def ctypes_invoke_with_floats(callback, a, b):
     """
     Calls the C++ function invoke_with_floats, passing a Python callback function
     and two float arguments.
 
     Parameters:
-        callback (function): A Python function that takes one float argument and returns a float.
+        callback (function): A Python function that takes one float argument and returns a float,
+            or a native function from native_integrand().
         a (float): The first float input.
         b (float): The second float input.
 
     Returns:
         float: The result of the callback applied to (a + b).
     """
-    # Load the DLL
-    lib_path = "./lib_calculus.so"  # Ensure the correct library file name and path
-    calculus = ctypes.CDLL(lib_path)
-    # Define ctypes function signature if not already defined
-    callback_function = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_double)
-    calculus.invoke_with_floats.argtypes = [callback_function, ctypes.c_double, ctypes.c_double]
-    calculus.invoke_with_floats.restype = ctypes.c_double
-
-    # Wrap the Python callback with ctypes
-    wrapped_callback = callback_function(callback)
-    return calculus.invoke_with_floats(wrapped_callback, a, b)
+    # The callback wrapper is reused, native functions are passed as they are
+    return native_backend.function("invoke_with_floats")(native_backend.callback(callback), a, b)
 
 def secant_root(callback, x0, x1, tol, max_iter):
     """
     Finds the root of a function using the secant method.
 
     Parameters:
-        callback (function): A Python function representing the equation f(x).
+        callback (function): A Python function representing the equation f(x), or a
+            native function from native_integrand().
         x0 (float): The first initial guess for the root.
         x1 (float): The second initial guess for the root.
         tol (float): The tolerance for convergence.
@@ -699,33 +2055,359 @@ def secant_root(callback, x0, x1, tol, max_iter):
     Returns:
         float: The approximate root if convergence is achieved; otherwise, NAN.
     """
-    # Load the shared library
-    lib_path = "./lib_calculus.so"  # Ensure the correct library file name and path
-    calculus = ctypes.CDLL(lib_path)
+    # The callback wrapper is reused, native functions are passed as they are
+    wrapped_callback = native_backend.callback(callback)
 
-    # Define the ctypes callback function type
-    callback_function = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_double)
+    # Invoke the C++ function and return the result
+    return native_backend.function("secant_root")(wrapped_callback, x0, x1, tol, max_iter)
 
-    # Define the argument and return types for the secant_root function
-    calculus.secant_root.argtypes = [
-        callback_function,
-        ctypes.c_double,
-        ctypes.c_double,
-        ctypes.c_double,
-        ctypes.c_int,
-    ]
-    calculus.secant_root.restype = ctypes.c_double
+def adapt_c(func, a, b, n=100, sens=10):
+    """
+    Integrates a function with the adaptive trapezoid algorithm adapt_c of calc.dll.
 
-    # Wrap the Python callback function
-    wrapped_callback = callback_function(callback)
+    Parameters:
+        func (function): A Python function taking and returning one float, or a
+            native function from native_integrand() to integrate without callbacks.
+        a (float): Lower bound of integration.
+        b (float): Upper bound of integration.
+        n (int): Number of coarse cells used for the second derivatives.
+        sens (int): Sensitivity of the refinement to the curvature of the function.
 
-    # Invoke the C++ function and return the result
-    return calculus.secant_root(wrapped_callback, x0, x1, tol, max_iter)
+    Returns:
+        float: The approximate integral.
+    """
+    # The callback wrapper is reused, native functions are passed as they are
+    wrapped_callback = native_backend.callback(func)
+    return native_backend.function("adapt_c", "calc")(wrapped_callback, a, b, n, sens)
+
+def adapt_c_batch(func, a, b, n=100, sens=10):
+    """
+    Integrates a function with the adaptive trapezoid algorithm of calc.dll,
+    using the batch callback interface adapt_c_batch. The native code hands
+    whole buffers of x values to Python, so the integrand is called twice per
+    integration with arrays instead of once per sample.
+
+    Parameters:
+        func (function): The function to integrate. Functions accepting NumPy
+            arrays are evaluated on each batch in one call, scalar-only functions
+            are evaluated point by point.
+        a (float): Lower bound of integration.
+        b (float): Upper bound of integration.
+        n (int): Number of coarse cells used for the second derivatives (at least 2).
+        sens (int): Sensitivity of the refinement to the curvature of the function.
+
+    Returns:
+        float: The approximate integral, NAN if n < 2 or the function is not finite.
+
+    Raises:
+        ValueError: If a bound is not finite, or the refinement needs more than 2^26
+            samples (the limit of calc.dll) or their buffers cannot be allocated.
+            Lower n or sens.
+        Exception: Any exception raised by `func`, once the native code has returned.
+    """
+    # an empty interval or a non-finite step would make the refinement counts NAN
+    if n >= 2:
+        if a == b:
+            return 0.0
+        if not math.isfinite((b - a) / n):
+            raise ValueError(f"adapt_c_batch needs finite bounds, got [{a}, {b}].")
+
+    # exceptions cannot cross the C++ code, they are kept and raised afterwards
+    errors = []
+    finite = [True]
+
+    def batch(x_ptr, y_ptr, count):
+        y = np.ctypeslib.as_array(y_ptr, shape=(count,))
+        try:
+            y[:] = evaluate_grid(func, np.ctypeslib.as_array(x_ptr, shape=(count,)))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+            y[:] = np.nan
+        finite[0] = finite[0] and bool(np.all(np.isfinite(y)))
+
+    result = native_backend.function("adapt_c_batch", "calc")(
+        native_backend.BATCH_CALLBACK(batch), a, b, n, sens)
+    if errors:
+        raise errors[0]
+    # NAN from finite samples means the refinement was too large
+    if math.isnan(result) and n >= 2 and finite[0]:
+        raise ValueError(f"adapt_c_batch cannot refine {n} cells with sens={sens}: "
+                         "too many samples, lower n or sens.")
+    return result
+
+# Location of the calibration profile of integrate(), next to this module
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".calculus_profile.json")
+
+# Layout of the profile written by calibrate(), older layouts are measured again
+PROFILE_FORMAT = 3
+
+# Number of subdivisions timed by calibrate() for each rule
+CALIBRATION_SIZES = (1000, 100000)
+
+def trapezoid_kernel(y, h):
+    """
+    Composite trapezoid rule of equally spaced samples, summed with math.fsum.
+    """
+    return h * (math.fsum(y.tolist()) - (y[0] + y[-1]) / 2)
+
+def simpson_kernel(y, h):
+    """
+    Composite Simpson rule of an odd number of equally spaced samples, summed with
+    math.fsum.
+    """
+    return h / 3 * (y[0] + y[-1] + 4 * math.fsum(y[1:-1:2].tolist())
+                    + 2 * math.fsum(y[2:-1:2].tolist()))
 
-def calculate_integrals():
+def scipy_rule(name):
+    """
+    Kernel of integrate() calling scipy.integrate.trapezoid or simpson, imported on
+    first use.
+    """
+    def kernel(y, h, _threads):
+        import scipy.integrate  # pylint: disable=import-outside-toplevel
+        return getattr(scipy.integrate, name)(y, dx=h)
+    return kernel
+
+# Kernels of integrate() for the rules on n + 1 equally spaced samples:
+# {method: {backend: kernel(y, h, threads)}}. Every backend of a method integrates
+# the same samples with the same weights, so they agree to rounding and the choice
+# of the calibration profile does not change the result.
+RULE_KERNELS = {
+    "trapezoid": {
+        "pure": lambda y, h, _threads: trapezoid_kernel(y, h),
+        "numpy": lambda y, h, _threads: np.trapezoid(y, dx=h),
+        "scipy": scipy_rule("trapezoid"),
+        "ctypes": lambda y, h, threads: integrate_native(
+            y, (0.0, h * (y.size - 1)), method="trapezoid", threads=threads),
+    },
+    "simpson": {
+        "pure": lambda y, h, _threads: simpson_kernel(y, h),
+        "scipy": scipy_rule("simpson"),
+        "ctypes": lambda y, h, threads: integrate_native(
+            y, (0.0, h * (y.size - 1)), method="simpson", threads=threads),
+    },
+}
+
+# Methods of integrate(). "adaptive" is adaptive_trap_py, driven by the tolerance;
+# adapt and adapt_c_batch refine by curvature with different rules and are not
+# interchangeable with it, so they are not dispatched.
+INTEGRATION_METHODS = ("trapezoid", "simpson", "adaptive")
+
+# Profiles loaded by load_profile(), by file name
+_profiles = {}
+
+def integrand_kind(f, a, b):
+    """
+    Classify an integrand for integrate().
+
+    Returns:
+        str: "native" for a name or id of a native function, "vectorized" if a call
+        with a NumPy array returns one value per point, "scalar" otherwise (Python
+        functions of one float, ctypes function pointers, ...).
+
+    Raises:
+        ValueError: If `f` is a name or id that is not a registered native function.
+    """
+    if isinstance(f, (str, int)):
+        native_id(f)
+        return "native"
+    # interior points avoid singular end points such as x = 0 of exp(-1/x)
+    x = np.linspace(a, b, 7)[1:-1]
+    try:
+        with np.errstate(all="ignore"):
+            y = np.asarray(f(x), dtype=float)
+    except (TypeError, ValueError, ArithmeticError, ctypes.ArgumentError):
+        return "scalar"
+    return "vectorized" if y.shape == x.shape else "scalar"
+
+def rule_samples(f, a, b, n, kind):
+    """
+    Samples of a Python integrand on n + 1 equally spaced points for the rules of
+    integrate(). Vectorized integrands go through sample_with_singularities, so
+    infinite samples are nudged; scalar-only integrands are evaluated point by point.
+    """
+    if kind == "vectorized":
+        return sample_with_singularities(f, a, b, n)["y"]
+    return evaluate_grid(f, np.linspace(a, b, n + 1))
+
+def available_backends(method, kind):
+    """
+    Backends of integrate() that can integrate this kind of integrand with `method`
+    and whose native code is loaded.
+
+    Returns:
+        list of str: "pure", "numpy", "scipy" and/or "ctypes".
+    """
+    loaded = native_backend.capabilities()["calculus"]
+    if method == "adaptive":
+        return [] if kind == "native" else ["pure"]
+    if kind == "native":
+        return ["ctypes"] if loaded[f"{method}_native"] and loaded["native_function"] else []
+    return [backend for backend in RULE_KERNELS[method]
+            if backend != "ctypes" or loaded[f"{method}_samples"]]
+
+def calibrate(path=None, repeats=3):
+    """
+    Time every kernel of the trapezoid and Simpson rules for each size in
+    CALIBRATION_SIZES, and store the fastest in a JSON profile. The profile records
+    the code (code_fingerprint), the machine (machine_fingerprint) and the available
+    native functions, load_profile() calibrates again when any of them changes.
+
+    Parameters:
+        path (str): Profile file, PROFILE_PATH if None. The profile is only kept in
+            memory if the file cannot be written.
+        repeats (int): Timed runs per kernel, the fastest run counts.
+
+    Returns:
+        dict: The profile, {"format", "code", "machine", "capabilities", "seconds",
+        "choices"}. The choices map each method to a list of [n, fastest backend].
+    """
+    seconds, choices = {}, {}
+    for method, kernels in RULE_KERNELS.items():
+        backends = available_backends(method, "vectorized")
+        seconds[method] = {backend: [] for backend in backends}
+        choices[method] = []
+        for n in CALIBRATION_SIZES:
+            y = np.sin(np.linspace(0.0, math.pi, n + 1))
+            fastest = {}
+            for backend in backends:
+                best = math.inf
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    kernels[backend](y, math.pi / n, 0)
+                    best = min(best, time.perf_counter() - start)
+                seconds[method][backend].append([n, best])
+                fastest[backend] = best
+            choices[method].append([n, min(fastest, key=fastest.get)])
+
+    profile = {"format": PROFILE_FORMAT, "code": code_fingerprint(),
+               "machine": machine_fingerprint(),
+               "capabilities": native_backend.capabilities(),
+               "seconds": seconds, "choices": choices}
+    path = path or PROFILE_PATH
+    try:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(profile, file, indent=1)
+    except OSError:
+        pass
+    _profiles[path] = profile
+    return profile
+
+def load_profile(path=None):
+    """
+    Return the calibration profile of integrate(), reading it from disk once per
+    process and calibrating if the file is missing or out of date.
+
+    Parameters:
+        path (str): Profile file, PROFILE_PATH if None.
+
+    Returns:
+        dict: The profile, see calibrate().
+    """
+    path = path or PROFILE_PATH
+    if path in _profiles:
+        return _profiles[path]
+    try:
+        with open(path, encoding="utf-8") as file:
+            profile = json.load(file)
+    except (OSError, ValueError):
+        profile = None
+    if (not isinstance(profile, dict) or profile.get("format") != PROFILE_FORMAT
+            or profile.get("code") != code_fingerprint()
+            or profile.get("machine") != machine_fingerprint()
+            or profile.get("capabilities") != native_backend.capabilities()):
+        return calibrate(path)
+    _profiles[path] = profile
+    return profile
+
+def choose_backend(method, kind, n, path=None):
+    """
+    Fastest backend for `method` and this kind of integrand according to the
+    calibration profile, taken at the calibrated size closest to n (log scale).
+    """
+    backends = available_backends(method, kind)
+    if not backends:
+        raise ValueError(f"No backend can integrate {kind} integrands with {method!r}.")
+    if len(backends) == 1:
+        return backends[0]
+    timed = load_profile(path)["choices"].get(method)
+    if not timed:
+        return backends[0]
+    _, backend = min(timed, key=lambda entry: abs(math.log(entry[0] / n)))
+    return backend if backend in backends else backends[0]
+
+def integrate(f, a, b, method="trapezoid", backend="auto", *, n=10000, tol=1e-6, threads=0,
+              profile=None):
+    # pylint: disable=too-many-arguments
+    """
+    Integrate `f` over [a, b] with the fastest available implementation of a method.
+
+    For "trapezoid" and "simpson" the integrand is sampled once on n + 1 equally
+    spaced points (see rule_samples) and the samples are summed by the kernel of the
+    backend: Python (pure), NumPy, SciPy or lib_calculus.so (ctypes). All kernels of
+    a rule give the same result up to rounding, so backend="auto" takes the fastest
+    one from the calibration profile (see calibrate()), measured once and stored on
+    disk. Native integrands are sampled and summed in C. "adaptive" is
+    adaptive_trap_py with the tolerance `tol`.
+
+    Parameters:
+        f (callable, str or int): The integrand, or a name or id of NATIVE_FUNCTIONS.
+            Polynomials are passed as the id returned by native_polynomial().
+        a (float): Lower bound of integration.
+        b (float): Upper bound of integration.
+        method (str): "trapezoid", "simpson" or "adaptive".
+        backend (str): "auto", "pure", "numpy", "scipy" or "ctypes".
+        n (int): Number of subdivisions of the rules, rounded up to even for Simpson.
+        tol (float): Tolerance of "adaptive".
+        threads (int): OpenMP threads of the ctypes kernels, 0 for the OpenMP default.
+        profile (str): Calibration profile file, PROFILE_PATH if None.
+
+    Returns:
+        dict: integral, method, backend, kind (of integrand), n and seconds (wall
+        time of sampling and summation).
+
+    Raises:
+        ValueError: If the method is unknown, n < 1 for a rule or the backend cannot
+            integrate `f`.
+    """
+    if method not in INTEGRATION_METHODS:
+        raise ValueError(f"Unknown method {method!r}, use one of {list(INTEGRATION_METHODS)}.")
+    if method != "adaptive" and n < 1:
+        raise ValueError("The number of subintervals `n` must be positive.")
+    if method == "simpson":
+        n += n % 2
+    kind = integrand_kind(f, a, b)
+    if backend == "auto":
+        backend = choose_backend(method, kind, n, profile)
+    elif backend not in available_backends(method, kind):
+        raise ValueError(f"Backend {backend!r} cannot integrate {kind} integrands with "
+                         f"{method!r}, use one of {available_backends(method, kind)}.")
+
+    start = time.perf_counter()
+    if method == "adaptive":
+        integral = adaptive_trap_py(f, a, b, tol)
+    elif kind == "native":
+        integral = integrate_native(f, (a, b), n, method, threads)
+    else:
+        y = rule_samples(f, a, b, n, kind)
+        integral = RULE_KERNELS[method][backend](y, (b - a) / n, threads)
+    seconds = time.perf_counter() - start
+    return {
+        "integral": float(integral),
+        "method": method,
+        "backend": backend,
+        "kind": kind,
+        "n": n,
+        "seconds": seconds}
+
+def calculate_integrals(use_cache=False):
     """
     Calculate integrals of the three given functions using all available algorithms.
     Print the results for each function and algorithm.
+
+    Parameters:
+        use_cache (bool): Share a cached_integrand between the algorithms of each
+            function and print its statistics.
     """
     print("Calculating integrals for all functions using all algorithms...\n")
     # List of functions and their integration intervals
@@ -746,9 +2428,12 @@ def calculate_integrals():
     # Iterate over each function and apply all algorithms
     for func, name, a, b in functions:
         print(f"Function: {name} on [{a}, {b}]")
+        # the adaptive rule samples dyadic points one at a time, which the uniform
+        # grids never revisit, so only the grid rules share the cache
+        grid_func = cached_integrand(func) if use_cache else func
         for algo_name, algo in algorithms.items():
             try:
-                result = algo(func, a, b)
+                result = algo(func if algo_name.startswith("Adaptive") else grid_func, a, b)
                 print(f"{algo_name}: {result:.6f}")
             except ZeroDivisionError as e:
                 print(f"{algo_name}: Division by zero error - {e}")
@@ -756,28 +2441,36 @@ def calculate_integrals():
                 print(f"{algo_name}: Invalid value error - {e}")
             except OverflowError as e:
                 print(f"{algo_name}: Overflow error - {e}")
+        if use_cache:
+            print(f"Cache: {grid_func.cache_info()}")
         print("\n")
 
 
 if __name__ == "__main__":
     calculate_integrals()
 
-def evaluate_integrals():
+def evaluate_integrals(use_cache=False):
     """
     Evaluate integrals of predefined functions using multiple methods and compare results.
 
+    Parameters:
+        use_cache (bool): Share a cached_integrand between the methods of each function.
+
     Returns:
         dict: A dictionary with the integration results for each function.
     """
     def integrate_and_compare(func, lower, upper):
         """Integrate using multiple methods and compare results."""
+        # only the two grid rules sample the same points, the adaptive rule is
+        # not cached (see calculate_integrals)
+        grid_func = cached_integrand(func) if use_cache else func
         methods = [
             ("Adaptive Trapezoidal", adaptive_trap_py,
              (func, lower, upper, 1e-6, 10)),
             ("Numpy Trapezoidal", trapezoid_numpy,
-             (func, lower, upper, 10000)),
+             (grid_func, lower, upper, 10000)),
             ("Scipy Trapezoidal", trapezoid_scipy,
-             (func, lower, upper, 10000)),
+             (grid_func, lower, upper, 10000)),
         ]
         results = {}
         for method_name, method_function, args in methods:
@@ -901,6 +2594,7 @@ def plot_function_with_roots(func, interval, roots, filename, description):
     """
     Plot the function over the given interval and mark the roots found.
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
     x = np.linspace(interval[0], interval[1], 1000)
     y = np.array([func(val) for val in x])
 
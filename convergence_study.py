@@ -0,0 +1,272 @@
+"""
+convergence_study.py
+This script compares the accuracy and cost of the integration algorithms of
+calculus.py on the integrals of the README.
+
+For every (function, method) pair the error is measured against a high-accuracy
+reference while n (or the tolerance) is refined. For each target number of correct
+digits the smallest number of function evaluations reaching it is searched by
+doubling n and then bisecting between the last two values. The jobs run in a
+process pool and the results are written as a table and as convergence plots.
+Study points are stored in the result cache (result_cache.py), so a re-run only
+computes what changed.
+
+Usage:
+    python convergence_study.py --output convergence.csv --plots "convergence plots"
+"""
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import calculus as calc
+import result_cache
+
+# README integrals: integrand and bounds
+FUNCTIONS = {
+    "exp(-1/x)": (calc.func1, 0.01, 10),
+    "cos(1/x)": (calc.func2, 0.01, 3 * np.pi),
+    "x^3+1": (calc.func3, -1, 1),
+}
+
+# Algorithms refined by the number of subdivisions n: (method(f, a, b, n), largest n)
+STEP_METHODS = {
+    "trapezoid": (calc.trapezoid, 2**20),
+    "trapezoid_python": (calc.trapezoid_python, 2**18),
+    "trapezoid_numpy": (calc.trapezoid_numpy, 2**20),
+    "trapezoid_scipy": (calc.trapezoid_scipy, 2**20),
+    "simpsons_rule": (lambda f, a, b, n: calc.simpsons_rule(f, a, b, 2 * n), 2**19),
+    "wrapper_simpson": (calc.wrapper_simpson, 2**20),
+    "adapt": (lambda f, a, b, n: calc.adapt(f, [a, b], n, 10), 2**12),
+    "gauss_legendre": (calc.gauss_legendre, 2**9),
+    "trapezoid tanh-sinh": (lambda f, a, b, n: calc.trapezoid(f, a, b, n, "tanh-sinh"), 2**16),
+}
+
+# Algorithms refined by the tolerance: (method(f, a, b, tol), smallest tolerance).
+# The adaptive trapezoid converges like h^2 in pure Python and stops earlier.
+TOLERANCE_METHODS = {
+    "adaptive_trap_stack": (lambda f, a, b, tol: calc.adaptive_trap_stack(
+        f, a, b, tol, max_depth=40), 1e-8),
+    "romberg": (lambda f, a, b, tol: calc.romberg(f, a, b, tol, max_levels=22), 1e-14),
+    "integrate_to_tol": (lambda f, a, b, tol: calc.integrate_to_tol(f, a, b, tol, 0.0), 1e-14),
+    "gauss_kronrod": (calc.gauss_kronrod, 1e-14),
+}
+
+# Correct digits are capped at double precision
+MAX_DIGITS = 16
+
+def reference_integral(name):
+    """
+    High-accuracy reference value of a README integral: the G10K21 Gauss-Kronrod
+    result, checked against tanh-sinh quadrature with 4000 points.
+
+    Returns:
+        tuple: (reference value, difference between the two methods)
+    """
+    func, a, b = FUNCTIONS[name]
+    reference = calc.gauss_kronrod(func, a, b, tol=1e-14, rule="G10K21")["integral"]
+    check = calc.trapezoid(func, a, b, 4000, "tanh-sinh")
+    return reference, abs(reference - check)
+
+def correct_digits(value, reference):
+    """
+    Number of correct significant digits, -log10 of the relative error.
+    """
+    error = abs(value - reference) / abs(reference)
+    return MAX_DIGITS if error == 0 else min(MAX_DIGITS, -math.log10(error))
+
+def study_point(name, method, parameter, reference):
+    """
+    Run one method on one README integral with instrumentation.
+
+    Parameters:
+        name (str): Key of FUNCTIONS.
+        method (str): Key of STEP_METHODS or TOLERANCE_METHODS.
+        parameter (int or float): n for step methods, the tolerance otherwise.
+        reference (float): Reference value of the integral.
+
+    Returns:
+        dict: function, method, parameter, value, error, digits, evaluations, seconds.
+    """
+    func, a, b = FUNCTIONS[name]
+    if method in STEP_METHODS:
+        run = STEP_METHODS[method][0]
+    else:
+        run = TOLERANCE_METHODS[method][0]
+    stats = calc.measure(run, func, a, b, parameter)
+    value = stats["result"]
+    if isinstance(value, dict):
+        value = value["integral"]
+    return {
+        "function": name,
+        "method": method,
+        "parameter": parameter,
+        "value": float(value),
+        "error": abs(float(value) - reference),
+        "digits": correct_digits(value, reference),
+        "evaluations": stats["samples"],
+        "seconds": stats["total_seconds"]}
+
+def minimum_step(point, target, n_max):
+    """
+    Find the smallest n with at least `target` correct digits, assuming the error
+    decreases with n: double n until the target is met, then bisect.
+
+    Parameters:
+        point (callable): Returns the study_point result for a given n (memoized).
+        target (float): Number of correct digits.
+        n_max (int): Largest n to try.
+
+    Returns:
+        dict or None: The study point at the smallest n, None if n_max is not enough.
+    """
+    low, high = 0, 1
+    while point(high)["digits"] < target:
+        if high >= n_max:
+            return None
+        low, high = high, min(2 * high, n_max)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if point(middle)["digits"] >= target:
+            high = middle
+        else:
+            low = middle
+    return point(high)
+
+def run_job(job):
+    """
+    Study one (function, method) pair.
+
+    Parameters:
+        job (tuple): (function name, method name, target digits, reference value,
+            result cache file or None)
+
+    Returns:
+        tuple: (sweep, minima). The sweep lists every evaluated study point, minima
+        holds the cheapest point for each target digit count that was reached.
+    """
+    name, method, targets, reference, cache = job
+    study = sys.modules[__name__]
+    run = (STEP_METHODS.get(method) or TOLERANCE_METHODS[method])[0]
+    points = {}
+
+    def point(parameter):
+        if parameter not in points:
+            def compute():
+                return study_point(name, method, parameter, reference)
+            if cache is None:
+                points[parameter] = compute()
+            else:
+                # study_point and its helpers live here, so this module is part of the key
+                points[parameter] = result_cache.cached_call(
+                    compute, FUNCTIONS[name], method,
+                    (run, parameter, reference, result_cache.source_fingerprint(study)),
+                    cache, machine=True)
+        return points[parameter]
+
+    minima = []
+    for target in targets:
+        if method in STEP_METHODS:
+            best = minimum_step(point, target, STEP_METHODS[method][1])
+        else:
+            tolerances = [10.0 ** -k for k in range(1, 15)
+                          if 10.0 ** -k >= TOLERANCE_METHODS[method][1]]
+            reached = [p for p in map(point, tolerances) if p["digits"] >= target]
+            best = min(reached, key=lambda p: p["evaluations"], default=None)
+        if best is not None:
+            minima.append(dict(best, target_digits=target))
+    return list(points.values()), minima
+
+def run_study(functions=None, methods=None, targets=range(1, 13), workers=None, cache=None):
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """
+    Run the convergence study.
+
+    Parameters:
+        functions (list of str): Keys of FUNCTIONS, all by default.
+        methods (list of str): Keys of STEP_METHODS and TOLERANCE_METHODS, all by default.
+        targets (iterable of int): Target numbers of correct digits.
+        workers (int): Number of worker processes, 1 runs in this process.
+        cache (str): Result cache file to consult first, None to compute everything.
+
+    Returns:
+        tuple of pandas.DataFrame: (table, sweep). The table has one row per function,
+        method and reached target digit count with the minimum evaluations, the sweep
+        every evaluated point.
+    """
+    functions = list(FUNCTIONS) if functions is None else functions
+    methods = list(STEP_METHODS) + list(TOLERANCE_METHODS) if methods is None else methods
+    references = {name: reference_integral(name)[0] for name in functions}
+    jobs = [(name, method, list(targets), references[name], cache)
+            for name in functions for method in methods]
+    if workers == 1:
+        results = list(map(run_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_job, jobs))
+
+    sweep = pd.DataFrame([p for points, _ in results for p in points])
+    table = pd.DataFrame([m for _, minima in results for m in minima],
+                         columns=["function", "method", "target_digits", "parameter",
+                                  "evaluations", "digits", "error", "seconds", "value"])
+    sweep = sweep.sort_values(["function", "method", "evaluations"], ignore_index=True)
+    return table, sweep
+
+def plot_convergence(sweep, directory):
+    """
+    Save one log-log plot of the error against the number of evaluations per function.
+
+    Returns:
+        list of str: The file names of the plots.
+    """
+    # imported here so the worker processes do not load matplotlib
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for name, data in sweep.groupby("function"):
+        plt.figure(figsize=(8, 6))
+        for method, points in data.groupby("method"):
+            points = points.sort_values("evaluations")
+            # Exact results are drawn at the double precision limit
+            error = np.maximum(points["error"] / abs(points["value"]), 10.0 ** -MAX_DIGITS)
+            plt.loglog(points["evaluations"], error, ".-", label=method)
+        plt.title(f"Convergence for {name}")
+        plt.xlabel("function evaluations")
+        plt.ylabel("relative error")
+        plt.legend(fontsize="small")
+        safe_name = name.replace("(", "").replace(")", "").replace("/", "-").replace("^", "")
+        filename = os.path.join(directory, f"convergence_{safe_name}.png")
+        plt.savefig(filename)
+        plt.close()
+        files.append(filename)
+    return files
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--functions", nargs="+", choices=list(FUNCTIONS))
+    parser.add_argument("--methods", nargs="+",
+                        choices=list(STEP_METHODS) + list(TOLERANCE_METHODS))
+    parser.add_argument("--digits", type=int, default=12, help="highest target digit count")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default="convergence.csv", help="CSV file for the table")
+    parser.add_argument("--plots", default="convergence plots", help="directory for plots")
+    parser.add_argument("--cache", default=result_cache.DEFAULT_PATH, help="result cache file")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every result")
+    args = parser.parse_args(argv)
+
+    table, sweep = run_study(args.functions, args.methods, range(1, args.digits + 1),
+                             args.workers, None if args.no_cache else args.cache)
+    table.to_csv(args.output, index=False)
+    print(table.pivot_table(index=["function", "method"], columns="target_digits",
+                            values="evaluations").to_string())
+    plot_convergence(sweep, args.plots)
+
+if __name__ == "__main__":
+    import matplotlib  # pylint: disable=import-outside-toplevel
+    matplotlib.use("Agg")
+    main()
@@ -7,17 +7,127 @@
  * - verify_arguments: Validates input to ensure it meets specific criteria.
  * - calculate_square: Computes the square of a number, with input validation.
  *
+ * It also ships a registry of compiled integrands and root-finding targets
+ * that can be selected by id, so the native routines can run without
+ * calling back into Python.
+ *
+ * The trapezoid and Simpson kernels run multi-threaded with OpenMP when the
+ * library is compiled with -fopenmp, otherwise they run on one thread.
+ *
  * Usage:
  * Compile this file into a shared library for Python:
- * g++ -shared -o lib_calculus.so -fPIC lib_calculus.cpp
+ * g++ -shared -fopenmp -o lib_calculus.so -fPIC lib_calculus.cpp
  */
 
+#include <array>         // Table of the polynomial slot functions
 #include <cmath>         // For NAN (Not-a-Number) representation
 #include <stdbool.h>     // For compatibility with C-style bool
 #include <iostream>      // IO handling
+#include <new>           // std::bad_alloc
+#include <mutex>         // Allocation of polynomial slots
+#include <utility>       // std::index_sequence for the polynomial slot functions
+#include <vector>        // Polynomial coefficient storage
+#ifdef _OPENMP
+#include <omp.h>         // Thread count of the integration kernels
+#endif
 
 typedef double (*CallbackFunction)(double);
 
+/**
+ * Ids of the compiled functions in the native function registry.
+ */
+enum NativeFunctionId {
+    NATIVE_EXP_INVERSE = 0,   // exp(-1/x)
+    NATIVE_COS_INVERSE = 1,   // cos(1/x)
+    NATIVE_POLYNOMIAL = 2,    // c[0] + c[1] x + ..., only through polynomial_handle
+    NATIVE_TANH = 3,          // tanh(x)
+    NATIVE_SIN = 4,           // sin(x)
+    NATIVE_INVERSE_SIN = 5,   // 1/sin(x)
+    NATIVE_FUNCTION_COUNT = 6
+};
+
+// Number of polynomials that can be registered, each gets its own function and id
+const int POLYNOMIAL_SLOTS = 256;
+
+// Coefficients of the registered polynomials, lowest order first, empty if unused.
+// A slot is written once by polynomial_handle and never changes afterwards.
+static std::vector<double> polynomial_coefficients[POLYNOMIAL_SLOTS];
+static std::mutex polynomial_mutex;
+static int polynomial_count = 0;
+
+static double native_exp_inverse(double x) {
+    return std::exp(-1.0 / x);
+}
+
+static double native_cos_inverse(double x) {
+    return std::cos(1.0 / x);
+}
+
+template <int slot>
+static double native_polynomial(double x) {
+    const std::vector<double>& coefficients = polynomial_coefficients[slot];
+    double result = 0.0;
+    // Horner's scheme, starting from the highest order coefficient
+    for (auto c = coefficients.rbegin(); c != coefficients.rend(); ++c) {
+        result = result * x + *c;
+    }
+    return result;
+}
+
+template <int... slots>
+static constexpr std::array<CallbackFunction, sizeof...(slots)> polynomial_table(
+        std::integer_sequence<int, slots...>) {
+    return {native_polynomial<slots>...};
+}
+
+// One function per polynomial slot, as callbacks only receive x
+static const std::array<CallbackFunction, POLYNOMIAL_SLOTS> polynomial_functions =
+    polynomial_table(std::make_integer_sequence<int, POLYNOMIAL_SLOTS>());
+
+static double native_tanh(double x) {
+    return std::tanh(x);
+}
+
+static double native_sin(double x) {
+    return std::sin(x);
+}
+
+static double native_inverse_sin(double x) {
+    return 1.0 / std::sin(x);
+}
+
+// NATIVE_POLYNOMIAL has no coefficients, its entry stays empty
+static const CallbackFunction native_functions[NATIVE_FUNCTION_COUNT] = {
+    native_exp_inverse,
+    native_cos_inverse,
+    nullptr,
+    native_tanh,
+    native_sin,
+    native_inverse_sin,
+};
+
+/**
+ * Number of OpenMP threads for a kernel, threads <= 0 selects the OpenMP default.
+ */
+static int kernel_threads(int threads) {
+#ifdef _OPENMP
+    return threads > 0 ? threads : omp_get_max_threads();
+#else
+    (void)threads;
+    return 1;
+#endif
+}
+
+/**
+ * Simpson weight (without the factor h/3) of grid point i out of 0..n.
+ */
+static double simpson_weight(long i, long n) {
+    if (i == 0 || i == n) {
+        return 1.0;
+    }
+    return (i % 2 == 1) ? 4.0 : 2.0;
+}
+
 extern "C" {
     /**
      * @brief Verifies if the provided argument is non-negative.
@@ -50,6 +160,163 @@ extern "C" {
         return x * x; // Return the square of the input
     }
 
+    /**
+     * @brief Returns the number of functions in the native function registry.
+     */
+    int native_function_count() {
+        return NATIVE_FUNCTION_COUNT;
+    }
+
+    /**
+     * @brief Looks up a compiled function by id.
+     *
+     * The returned pointer can be passed to every routine taking a
+     * CallbackFunction (secant_root, invoke_with_floats, adapt_c, ...),
+     * which then runs without calling back into Python.
+     *
+     * @param id One of the NativeFunctionId values or an id from polynomial_handle.
+     * @return The function pointer, or nullptr for an unknown id, NATIVE_POLYNOMIAL
+     *         and unregistered polynomial ids.
+     */
+    CallbackFunction native_function(int id) {
+        if (id >= 0 && id < NATIVE_FUNCTION_COUNT) {
+            return native_functions[id];
+        }
+        int slot = id - NATIVE_FUNCTION_COUNT;
+        std::lock_guard<std::mutex> lock(polynomial_mutex);
+        if (slot < 0 || slot >= polynomial_count) {
+            return nullptr;
+        }
+        return polynomial_functions[slot];
+    }
+
+    /**
+     * @brief Registers a polynomial and returns its id.
+     *
+     * The polynomial is c[0] + c[1] x + ... + c[n-1] x^(n-1). Every call takes a
+     * new slot with its own function, so ids and function pointers returned
+     * earlier keep their coefficients.
+     *
+     * @param coefficients Pointer to n coefficients, lowest order first.
+     * @param n The number of coefficients.
+     * @return The id for native_function and the kernels, or -1 for n < 1 or
+     *         when all POLYNOMIAL_SLOTS are taken.
+     */
+    int polynomial_handle(const double* coefficients, int n) {
+        if (coefficients == nullptr || n < 1) {
+            return -1;
+        }
+        std::lock_guard<std::mutex> lock(polynomial_mutex);
+        if (polynomial_count >= POLYNOMIAL_SLOTS) {
+            return -1;
+        }
+        try {
+            polynomial_coefficients[polynomial_count].assign(coefficients, coefficients + n);
+        } catch (const std::bad_alloc&) {
+            return -1;
+        }
+        return NATIVE_FUNCTION_COUNT + polynomial_count++;
+    }
+
+    /**
+     * @brief Evaluates a registered function at x.
+     *
+     * @return The function value, or NAN for an unknown id or NATIVE_POLYNOMIAL.
+     */
+    double native_evaluate(int id, double x) {
+        CallbackFunction func = native_function(id);
+        if (func == nullptr) {
+            return NAN;
+        }
+        return func(x);
+    }
+
+    /**
+     * @brief Trapezoidal rule for a registered function, OpenMP parallel.
+     *
+     * @param id One of the NativeFunctionId values.
+     * @param a Lower bound of integration.
+     * @param b Upper bound of integration.
+     * @param n Number of subdivisions.
+     * @param threads Number of threads, 0 for the OpenMP default.
+     * @return The approximate integral, NAN for an unknown id or n < 1.
+     */
+    double trapezoid_native(int id, double a, double b, long n, int threads) {
+        CallbackFunction func = native_function(id);
+        if (func == nullptr || n < 1) {
+            return NAN;
+        }
+        double h = (b - a) / n;
+        double sum = 0.5 * (func(a) + func(b));
+        #pragma omp parallel for reduction(+:sum) num_threads(kernel_threads(threads))
+        for (long i = 1; i < n; i++) {
+            sum += func(a + i * h);
+        }
+        return sum * h;
+    }
+
+    /**
+     * @brief Simpson's rule for a registered function, OpenMP parallel.
+     *
+     * @param n Number of subdivisions, must be even.
+     * @return The approximate integral, NAN for an unknown id or invalid n.
+     * Other parameters as in trapezoid_native.
+     */
+    double simpson_native(int id, double a, double b, long n, int threads) {
+        CallbackFunction func = native_function(id);
+        if (func == nullptr || n < 2 || n % 2 != 0) {
+            return NAN;
+        }
+        double h = (b - a) / n;
+        double sum = 0.0;
+        #pragma omp parallel for reduction(+:sum) num_threads(kernel_threads(threads))
+        for (long i = 0; i <= n; i++) {
+            sum += simpson_weight(i, n) * func(a + i * h);
+        }
+        return sum * h / 3.0;
+    }
+
+    /**
+     * @brief Trapezoidal rule for equally spaced samples, OpenMP parallel.
+     *
+     * @param y Pointer to the samples, read in place (e.g. a NumPy array).
+     * @param count Number of samples.
+     * @param dx Spacing of the samples.
+     * @param threads Number of threads, 0 for the OpenMP default.
+     * @return The approximate integral, NAN for fewer than 2 samples.
+     */
+    double trapezoid_samples(const double* y, long count, double dx, int threads) {
+        if (y == nullptr || count < 2) {
+            return NAN;
+        }
+        double sum = 0.5 * (y[0] + y[count - 1]);
+        #pragma omp parallel for reduction(+:sum) num_threads(kernel_threads(threads))
+        for (long i = 1; i < count - 1; i++) {
+            sum += y[i];
+        }
+        return sum * dx;
+    }
+
+    /**
+     * @brief Simpson's rule for equally spaced samples, OpenMP parallel.
+     *
+     * @param count Number of samples, must be odd (an even number of intervals).
+     * @return The approximate integral, NAN for invalid counts.
+     * Other parameters as in trapezoid_samples.
+     */
+    double simpson_samples(const double* y, long count, double dx, int threads) {
+        if (y == nullptr || count < 3 || count % 2 == 0) {
+            return NAN;
+        }
+        long n = count - 1;
+        double sum = 0.0;
+        #pragma omp parallel for reduction(+:sum) num_threads(kernel_threads(threads))
+        for (long i = 0; i <= n; i++) {
+            sum += simpson_weight(i, n) * y[i];
+        }
+        return sum * dx / 3.0;
+    }
+
     /**
      * Applies a Python math function (via callback) to two floats.
      * The result is the evaluation of `callback(a + b)`.
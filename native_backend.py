@@ -0,0 +1,153 @@
+"""
+native_backend.py
+This module loads the compiled libraries lib_calculus.so and calc.dll for calculus.py.
+
+Each library is loaded once, relative to this file instead of the working directory,
+and the argument and return types of every exported function are declared when it
+is loaded. Python callbacks are wrapped into ctypes function pointers once per
+callable. Missing libraries or symbols are reported by capabilities(), so callers
+can fall back to the Python implementations.
+"""
+import ctypes
+import functools
+import os
+import weakref
+import numpy as np
+
+# Directory of the compiled libraries
+LIBRARY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Library files by name
+LIBRARIES = {
+    "calculus": "lib_calculus.so",
+    "calc": "calc.dll",
+}
+
+# Callback types: double f(double) and void f(const double* x, double* y, int count)
+CALLBACK = ctypes.CFUNCTYPE(ctypes.c_double, ctypes.c_double)
+BATCH_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.POINTER(ctypes.c_double),
+                                  ctypes.POINTER(ctypes.c_double), ctypes.c_int)
+
+# Contiguous float64 array passed to C without copying
+SAMPLES = np.ctypeslib.ndpointer(np.float64, ndim=1, flags="C_CONTIGUOUS")
+
+# (argument types, return type) of the exported functions of each library
+SIGNATURES = {
+    "calculus": {
+        "verify_arguments": ([ctypes.c_double], ctypes.c_bool),
+        "calculate_square": ([ctypes.c_double], ctypes.c_double),
+        "invoke_with_floats": ([CALLBACK, ctypes.c_double, ctypes.c_double], ctypes.c_double),
+        "secant_root": ([CALLBACK, ctypes.c_double, ctypes.c_double, ctypes.c_double,
+                         ctypes.c_int], ctypes.c_double),
+        "native_function_count": ([], ctypes.c_int),
+        "native_function": ([ctypes.c_int], CALLBACK),
+        "polynomial_handle": ([ctypes.POINTER(ctypes.c_double), ctypes.c_int], ctypes.c_int),
+        "native_evaluate": ([ctypes.c_int, ctypes.c_double], ctypes.c_double),
+        "trapezoid_native": ([ctypes.c_int, ctypes.c_double, ctypes.c_double, ctypes.c_long,
+                              ctypes.c_int], ctypes.c_double),
+        "simpson_native": ([ctypes.c_int, ctypes.c_double, ctypes.c_double, ctypes.c_long,
+                            ctypes.c_int], ctypes.c_double),
+        "trapezoid_samples": ([SAMPLES, ctypes.c_long, ctypes.c_double, ctypes.c_int],
+                              ctypes.c_double),
+        "simpson_samples": ([SAMPLES, ctypes.c_long, ctypes.c_double, ctypes.c_int],
+                            ctypes.c_double),
+    },
+    "calc": {
+        "verify_arguments": ([ctypes.c_double], ctypes.c_bool),
+        "calculate_square": ([ctypes.c_double], ctypes.c_double),
+        "adapt_c": ([CALLBACK, ctypes.c_double, ctypes.c_double, ctypes.c_int, ctypes.c_int],
+                    ctypes.c_double),
+        "adapt_c_batch": ([BATCH_CALLBACK, ctypes.c_double, ctypes.c_double, ctypes.c_int,
+                           ctypes.c_int], ctypes.c_double),
+    },
+}
+
+# ctypes wrappers of Python callbacks, released together with the callable
+_callbacks = weakref.WeakKeyDictionary()
+
+@functools.lru_cache(maxsize=None)
+def load_library(name):
+    """
+    Load a library once and declare the signatures of its exported functions.
+
+    Parameters:
+        name (str): A key of LIBRARIES.
+
+    Returns:
+        tuple: (ctypes.CDLL, dict of bound functions by symbol name). Symbols that
+        the library does not export are left out.
+
+    Raises:
+        OSError: If the library file cannot be loaded.
+    """
+    library = ctypes.CDLL(os.path.join(LIBRARY_DIR, LIBRARIES[name]))
+    functions = {}
+    for symbol, (argtypes, restype) in SIGNATURES[name].items():
+        try:
+            bound = getattr(library, symbol)
+        except AttributeError:
+            continue
+        bound.argtypes = argtypes
+        bound.restype = restype
+        functions[symbol] = bound
+    return library, functions
+
+def function(name, library="calculus"):
+    """
+    Return an exported function with its declared signature.
+
+    Raises:
+        OSError: If the library cannot be loaded or does not export the function.
+    """
+    functions = load_library(library)[1]
+    if name not in functions:
+        raise OSError(f"{LIBRARIES[library]} does not export {name}.")
+    return functions[name]
+
+def capabilities():
+    """
+    Report which native functions are available.
+
+    Returns:
+        dict: {library name: {symbol: bool}} for every function in SIGNATURES.
+    """
+    available = {}
+    for name, signatures in SIGNATURES.items():
+        try:
+            functions = load_library(name)[1]
+        except OSError:
+            functions = {}
+        available[name] = {symbol: symbol in functions for symbol in signatures}
+    return available
+
+def callback(func):
+    """
+    Wrap a Python function into a CALLBACK function pointer for the native code.
+
+    The wrapper is created once per callable and reused while the callable is alive.
+    It only keeps a weak reference to the callable, so caching does not keep it
+    alive. Native function pointers from lib_calculus.so are returned unchanged.
+    Callables that do not support weak references get a new wrapper each time.
+
+    Parameters:
+        func (callable): Function taking and returning one float.
+
+    Returns:
+        CALLBACK: The function pointer, valid as long as `func` is alive.
+    """
+    if isinstance(func, CALLBACK):
+        return func
+    try:
+        return _callbacks[func]
+    except KeyError:
+        reference = weakref.ref(func)
+    except TypeError:
+        # not hashable or no weak references (e.g. NumPy ufuncs)
+        return CALLBACK(func)
+
+    def trampoline(x):
+        return reference()(x)
+
+    wrapped = CALLBACK(trampoline)
+    _callbacks[func] = wrapped
+    return wrapped
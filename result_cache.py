@@ -0,0 +1,204 @@
+"""
+result_cache.py
+This module stores results of integration and root finding runs in an SQLite file,
+so studies and benchmarks can be re-run without recomputing unchanged results.
+
+Results are keyed by a SHA-256 hash of the function's code object and constants,
+the method, its parameters and calculus.code_fingerprint(), a hash of calculus.py and
+the native libraries. Changing a lambda, a parameter, an algorithm or rebuilding a
+library therefore gives a new key. Callers computing results with code of their own
+add source_fingerprint() of their module to the parameters. Results containing
+timings are also keyed by calculus.machine_fingerprint(), so they are only reused on
+the machine that measured them.
+"""
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+import types
+import numpy as np
+import calculus as calc
+
+# Default location of the cache file, next to this module
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".calculus_cache.sqlite")
+
+# Default size limit of the stored results
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+def fingerprint(obj):
+    # pylint: disable=too-many-return-statements
+    """
+    Describe `obj` as text that is stable across runs, for hashing.
+
+    Python functions are described by their code (bytecode, constants, names, nested
+    code objects), defaults and closure values. Builtins and NumPy ufuncs use their
+    name. Objects without a stable description fall back to repr(), which may contain
+    a memory address: such keys never match in a later run, so they never give
+    wrong hits.
+    """
+    if isinstance(obj, types.FunctionType):
+        closure = tuple(cell.cell_contents for cell in obj.__closure__ or ())
+        return (f"function {obj.__module__}.{obj.__qualname__} {fingerprint(obj.__code__)} "
+                f"{fingerprint(obj.__defaults__)} {fingerprint(closure)}")
+    if isinstance(obj, types.CodeType):
+        return (f"code {obj.co_code.hex()} {fingerprint(obj.co_consts)} "
+                f"{fingerprint(obj.co_names)}")
+    if isinstance(obj, functools.partial):
+        return (f"partial {fingerprint(obj.func)} {fingerprint(obj.args)} "
+                f"{fingerprint(obj.keywords)}")
+    if isinstance(obj, (tuple, list)):
+        return f"{type(obj).__name__}({', '.join(map(fingerprint, obj))})"
+    if isinstance(obj, dict):
+        items = sorted((repr(key), fingerprint(value)) for key, value in obj.items())
+        return f"dict({', '.join(f'{key}: {value}' for key, value in items)})"
+    if isinstance(obj, np.ndarray):
+        return f"ndarray {obj.dtype} {obj.shape} {hashlib.sha256(obj.tobytes()).hexdigest()}"
+    if isinstance(obj, (types.BuiltinFunctionType, np.ufunc)):
+        return f"builtin {getattr(obj, '__module__', None)}.{obj.__name__}"
+    return repr(obj)
+
+@functools.lru_cache(maxsize=None)
+def source_fingerprint(module):
+    """
+    SHA-256 of the source file of `module`, for results computed by code outside
+    calculus.py (e.g. the study points of convergence_study.py). Pass it in params.
+    """
+    with open(module.__file__, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def cache_key(func, method, params=(), machine=False):
+    """
+    Hash of an integrand or root function, the method, its parameters and the code of
+    calculus.py and the native libraries.
+
+    Parameters:
+        func (callable): The integrand or function whose root is searched.
+        method (str or callable): The algorithm.
+        params: Parameters of the run (tuple, dict, ...).
+        machine (bool): Also hash the machine identity, for results with timings.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    parts = [fingerprint(func), fingerprint(method), fingerprint(params),
+             calc.code_fingerprint()]
+    if machine:
+        parts.append(calc.machine_fingerprint())
+    text = "\n".join(parts)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+@contextlib.contextmanager
+def open_cache(path=None):
+    """
+    Open (and create if needed) the cache database for one transaction.
+
+    Yields:
+        sqlite3.Connection: Connection to the cache file, committed and closed on exit.
+    """
+    connection = sqlite3.connect(path or DEFAULT_PATH, timeout=60)
+    try:
+        with connection:
+            connection.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, method TEXT, version TEXT, value BLOB, bytes INTEGER,
+                created REAL, used REAL)""")
+            yield connection
+    finally:
+        connection.close()
+
+def method_name(method):
+    """
+    Name of a method used for invalidation.
+    """
+    return method if isinstance(method, str) else getattr(method, "__name__", repr(method))
+
+def cached_call(compute, func, method, params=(), path=None, max_bytes=DEFAULT_MAX_BYTES,
+                machine=False):
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """
+    Return the stored result for (func, method, params) or compute and store it.
+
+    Example:
+        cached_call(lambda: calc.romberg(calc.func1, .01, 10, 1e-10),
+                    calc.func1, calc.romberg, (.01, 10, 1e-10))
+
+    Parameters:
+        compute (callable): Computes the result without arguments. The result must
+            be picklable.
+        func (callable): The integrand or function whose root is searched.
+        method (str or callable): The algorithm.
+        params: Parameters of the run.
+        path (str): Cache file, DEFAULT_PATH if None.
+        max_bytes (int): Size limit, least recently used results are evicted beyond it.
+        machine (bool): Only reuse results computed on this machine, needed when the
+            result contains timings.
+
+    Returns:
+        The stored or computed result.
+    """
+    key = cache_key(func, method, params, machine)
+    with open_cache(path) as connection:
+        row = connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            connection.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            return pickle.loads(row[0])
+
+    value = compute()
+    blob = pickle.dumps(value)
+    now = time.time()
+    with open_cache(path) as connection:
+        connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (key, method_name(method), calc.code_fingerprint(), blob, len(blob),
+                            now, now))
+        evict(connection, max_bytes)
+    return value
+
+def evict(connection, max_bytes):
+    """
+    Delete the least recently used results until the stored results fit in max_bytes.
+    """
+    total = connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()[0]
+    for key, size in connection.execute(
+            "SELECT key, bytes FROM results ORDER BY used").fetchall():
+        if total <= max_bytes:
+            break
+        connection.execute("DELETE FROM results WHERE key = ?", (key,))
+        total -= size
+
+def invalidate(path=None, method=None, before=None, other_versions=False):
+    """
+    Delete stored results.
+
+    Parameters:
+        path (str): Cache file, DEFAULT_PATH if None.
+        method (str or callable): Only delete results of this method.
+        before (float): Only delete results created before this time.time() value.
+        other_versions (bool): Only delete results of other versions of calculus.py
+            or the native libraries (code_fingerprint), which can never be hit again.
+
+    Returns:
+        int: Number of deleted results. Without any filter the whole cache is cleared.
+    """
+    conditions, values = [], []
+    if method is not None:
+        conditions.append("method = ?")
+        values.append(method_name(method))
+    if before is not None:
+        conditions.append("created < ?")
+        values.append(before)
+    if other_versions:
+        conditions.append("version != ?")
+        values.append(calc.code_fingerprint())
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    with open_cache(path) as connection:
+        return connection.execute(f"DELETE FROM results{where}", values).rowcount
+
+def cache_info(path=None):
+    """
+    Number of stored results and their total size in bytes.
+    """
+    with open_cache(path) as connection:
+        return connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM results").fetchone()
@@ -0,0 +1,77 @@
+"""
+Unit testing module for testing functions in benchmark_calculus.py
+"""
+import math
+import pytest
+import benchmark_calculus as bench
+
+def test_time_call():
+    """
+    Test the statistics of time_call and the peak memory of an allocating call.
+    """
+    stats = bench.time_call(lambda: bytearray(10**6), repeats=5, warmup=2)
+    assert stats["repeats"] == 5
+    assert 0 < stats["min_ns"] <= stats["median_ns"]
+    assert stats["iqr_ns"] >= 0
+    assert stats["peak_bytes"] >= 10**6
+    assert len(stats["value"]) == 10**6
+
+def test_run_benchmarks():
+    """
+    Test a small benchmark run: every README function is covered, the values are the
+    integrals and roots, and failing cases are reported instead of raised.
+    """
+    rows = bench.run_benchmarks(sizes=[100], repeats=1, warmup=0, select="trap")
+    methods = {row["method"] for row in rows}
+    assert {"trapezoid", "trapezoid_numpy", "adaptive_trap_py"} <= methods
+    assert {row["function"] for row in rows} == {"exp(-1/x)", "cos(1/x)", "x^3+1"}
+    assert all(row["error"] is None for row in rows)
+    polynomial = [row for row in rows if row["function"] == "x^3+1"]
+    assert all(math.isclose(row["value"], 2, rel_tol=1e-6) for row in polynomial)
+
+    roots = bench.run_benchmarks(repeats=1, warmup=0, select="secant_root")
+    assert [row["function"] for row in roots] == ["tanh(x)", "tanh(x)", "sin(x)", "sin(x)"]
+    assert math.isclose(roots[-1]["value"], math.pi)
+
+@pytest.mark.parametrize("extension", ["json", "csv"])
+def test_results_round_trip(tmp_path, extension):
+    """
+    Test that results written to JSON and CSV are read back unchanged.
+    """
+    rows = bench.run_benchmarks(sizes=[10], repeats=2, warmup=0, select="adapt_c_batch")
+    rows.append(dict.fromkeys(bench.FIELDS, None) | {
+        "group": "root", "method": "broken", "function": "sin(x)", "error": "ValueError: x"})
+    path = str(tmp_path / f"results.{extension}")
+    bench.write_results(rows, path)
+    assert bench.read_results(path) == rows
+
+def test_compare_to_baseline():
+    """
+    Test that only slowdowns beyond the threshold and the baseline noise are flagged.
+    """
+    def row(method, median, iqr=0.0):
+        return dict.fromkeys(bench.FIELDS) | {
+            "group": "integral", "method": method, "function": "x^3+1", "n": 100,
+            "median_ns": median, "iqr_ns": iqr}
+    baseline = [row("fast", 100.0), row("noisy", 100.0, 50.0), row("slow", 100.0),
+                row("removed", 100.0)]
+    rows = [row("fast", 105.0), row("noisy", 140.0), row("slow", 200.0), row("new", 1.0)]
+    comparison = bench.compare_to_baseline(rows, baseline, threshold=0.1)
+    assert [(c["method"], c["regression"]) for c in comparison] == [
+        ("fast", False), ("noisy", False), ("slow", True)]
+    assert comparison[2]["ratio"] == 2.0
+
+def test_main_flags_regressions(tmp_path):
+    """
+    Test the command line: a baseline that is much faster makes main return 1.
+    """
+    baseline = str(tmp_path / "baseline.json")
+    assert bench.main(["--sizes", "10", "--repeats", "1", "--select", "gauss_legendre",
+                       "--output", baseline]) == 0
+    rows = bench.read_results(baseline)
+    for row in rows:
+        row["median_ns"] /= 1000
+        row["iqr_ns"] = 0.0
+    bench.write_results(rows, baseline)
+    assert bench.main(["--repeats", "1", "--select", "gauss_legendre",
+                       "--baseline", baseline]) == 1
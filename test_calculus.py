@@ -1,12 +1,17 @@
 """
 Unit testing module for testing functions in calculus.py
 """
+# pylint: disable=too-many-lines
 import ctypes
+import json
 import os
 import math
+import subprocess
+import sys
 from unittest.mock import patch
 import pytest
 import numpy as np
+from scipy.integrate import simpson
 import calculus as calc
 # Ctypes initialization routine
 # Load the shared library
@@ -67,6 +72,37 @@ def test_adapt_c():
     assert np.isclose(result2, 7.9, .1)
     result3=new_calc.adapt_c(python_exp_c, .01, 10, 100, 1000)
     assert np.isclose(result3, 7.2, .1)
+def test_adapt_c_batch():
+    """
+    test adapt_c_batch confirms that the batch callback
+    interface of calc.dll integrates correctly while
+    calling the integrand only twice.
+    """
+    calls = []
+    def counted_cubic(x):
+        calls.append(len(x))
+        return cubic(x)
+    result = calc.adapt_c_batch(counted_cubic, -1, 1, 10, 10)
+    assert np.isclose(result, 2, rtol=1e-3)
+    assert len(calls) == 2 and calls[0] == 11
+    assert np.isclose(calc.adapt_c_batch(cosine, .01, 3*np.pi, 200, 100), 7.91, rtol=1e-2)
+    assert np.isclose(calc.adapt_c_batch(math.exp, 0, 1, 50, 10), math.e - 1, rtol=1e-4)
+    assert math.isnan(calc.adapt_c_batch(cubic, -1, 1, 1, 10))
+    # refinements beyond the sample limit of calc.dll raise instead of aborting
+    for n, sens in ((20000, 10), (10000, 1000)):
+        with pytest.raises(ValueError):
+            calc.adapt_c_batch(calc.func2, .01, 3*np.pi, n, sens)
+    assert math.isnan(calc.adapt_c_batch(lambda x: np.full_like(x, np.nan), 0, 1, 10, 10))
+    # every exception of the integrand reaches the caller
+    def failing_model(x):
+        raise RuntimeError(f"model failed on {x.size} points")
+    with pytest.raises(KeyError):
+        calc.adapt_c_batch(lambda x: {}[x.size], 0, 1, 10, 10)
+    with pytest.raises(RuntimeError):
+        calc.adapt_c_batch(failing_model, 0, 1, 10, 10)
+    assert calc.adapt_c_batch(cubic, 2, 2, 10, 10) == 0.0
+    with pytest.raises(ValueError):
+        calc.adapt_c_batch(cubic, 0, math.inf, 10, 10)
 # Define the function to integrate outside the test function
 def test_wrapper_simpson():
     """
@@ -234,6 +270,32 @@ def test_zero_root_tangent():
     result = calc.tangent_pure_python(func, fprime, x0=0.1, maxiter=100)
     assert result['converged'] is True, "Method did not converge"
     assert pytest.approx(result['root'], abs=1e-5) == 0, f"Expected 0, but got {result['root']}"
+def test_tangent_many():
+    """
+    Test the array tangent method lane by lane against tangent_pure_python,
+    with per-lane tolerances, a zero derivative and non-convergence.
+    """
+    x0 = np.array([3, -3, 1, 0.1, 1000])
+    tol = np.array([1e-6, 1e-10, 1e-6, 1e-6, 1e-6])
+    result = calc.tangent_many(lambda x: x**2 - 4, lambda x: 2 * x, x0, tol=tol)
+    assert result.dtype == calc.ROOT_DTYPE and result.shape == x0.shape
+    for lane, start, lane_tol in zip(result, x0, tol):
+        expected = calc.tangent_pure_python(lambda x: x**2 - 4, lambda x: 2 * x, start, lane_tol)
+        assert lane["converged"] == expected["converged"]
+        assert lane["iterations"] == expected["iterations"]
+        assert math.isclose(lane["root"], expected["root"], rel_tol=1e-12)
+
+    flat = calc.tangent_many(np.sin, np.cos, [np.pi / 2, 3])
+    assert not flat["converged"][0] and np.isnan(flat["root"][0]) and flat["iterations"][0] == 0
+    assert flat["converged"][1] and math.isclose(flat["root"][1], math.pi)
+    stopped = calc.tangent_many(lambda x: x**2 + 1, lambda x: 2 * x, 3.0, maxiter=5)
+    assert not stopped["converged"] and stopped["iterations"] == 5
+
+    # parameter sweep: square roots of 10^4 values
+    c = np.linspace(1, 100, 10000)
+    sweep = calc.tangent_many(lambda x, k: x**2 - k, lambda x, k: 2 * x, 10, c, tol=1e-12)
+    assert sweep["converged"].all() and np.allclose(sweep["root"], np.sqrt(c), rtol=1e-14)
+
 def test_trapezoid_numpy():
     '''
     Unit test for numpy implementation of trapezoid method
@@ -247,6 +309,231 @@ def test_trapezoid_scipy():
     '''
     assert np.isclose(calc.trapezoid_scipy(np.sin, 0, np.pi), 2)
 
+def test_cumulative_integral():
+    '''
+    Unit test for the O(n) running integral against the trapezoid and
+    simpson results on every prefix of the samples
+    '''
+    x = np.linspace(0, np.pi, 21)
+    y = np.sin(x)
+    running = calc.cumulative_integral(y, x)
+    assert np.allclose(running, [np.trapezoid(y[:i+1], x[:i+1]) for i in range(len(x))])
+    simpson_running = calc.cumulative_integral(y, dx=x[1], method="simpson")
+    assert np.allclose(simpson_running[::2],
+                       [calc.simpsons_rule(np.sin, 0, x[i], i) if i else 0
+                        for i in range(0, len(x), 2)])
+    assert np.allclose(calc.cumulative_integral(y, x, every=5), running[::5])
+    with pytest.raises(ValueError):
+        calc.cumulative_integral(y, x**2, method="simpson")
+    assert calc.cumulative_integral([2.0]).tolist() == [0.0]
+    for samples, points, every in (([], None, 1), (y, x[:-1], 1), (y, x, 0)):
+        with pytest.raises(ValueError):
+            calc.cumulative_integral(samples, points, every=every)
+    grid, curve = calc.trapezoid_cumulative(np.sin, 0, np.pi, 1000, every=100)
+    assert len(grid) == len(curve) == 11
+    assert np.isclose(curve[-1], calc.trapezoid_numpy(np.sin, 0, np.pi, 1000))
+
+def test_stream_integrate(tmp_path):
+    '''
+    Unit test for streaming integration of files and generators, which must agree
+    with the in-memory np.trapezoid and scipy simpson results
+    '''
+    x = np.sort(np.random.default_rng(1).uniform(0, 10, 10001))
+    y = np.exp(-1/x)
+    data = np.column_stack((x, y))
+    np.save(tmp_path / "trace.npy", data)
+    data.tofile(tmp_path / "trace.bin")
+    def generator():
+        for i in range(0, len(x), 999):
+            yield x[i:i+999], y[i:i+999]
+    for source in (tmp_path / "trace.npy", str(tmp_path / "trace.bin"), generator()):
+        assert np.isclose(calc.stream_integrate(source, chunk_size=1000),
+                          np.trapezoid(y, x), rtol=1e-12)
+    for size in (3, 1000, 10001):
+        assert np.isclose(calc.stream_integrate(data, "simpson", chunk_size=size),
+                          simpson(y, x=x), rtol=1e-12)
+        assert np.isclose(calc.stream_integrate(data[:-1], "simpson", chunk_size=size),
+                          simpson(y[:-1], x=x[:-1]), rtol=1e-12)
+    with pytest.raises(ValueError):
+        calc.stream_integrate(np.zeros((10, 3)))
+
+def test_cached_integrand():
+    """
+    Test the evaluation cache: results match the uncached function, shared grid
+    points are hits, the LRU limits hold and scalar root finders work unchanged.
+    """
+    cached = calc.cached_integrand(calc.func1)
+    assert calc.trapezoid(cached, .01, 10, 1000) == calc.trapezoid(calc.func1, .01, 10, 1000)
+    assert cached.cache_info() == calc.CacheInfo(0, 1001, 2**20, 1001)
+    assert math.isclose(calc.simpsons_rule(cached, .01, 10, 1000), 7.225450221940204,
+                        rel_tol=1e-12)
+    assert cached.cache_info().hits == 1001
+    cached.cache_clear()
+    assert cached.cache_info() == calc.CacheInfo(0, 0, 2**20, 0)
+
+    calls = []
+    def scalar_sin(x):
+        value = math.sin(x)  # raises for arrays, so only scalar calls are recorded
+        calls.append(x)
+        return value
+    small = calc.cached_integrand(scalar_sin, max_entries=3)
+    assert small(np.array([0.0, 1.0, 0.0])).tolist() == [0.0, math.sin(1.0), 0.0]
+    assert small(2.0) == math.sin(2.0) and small(0.0) == 0.0
+    small(3.0)  # evicts 1.0, the least recently used point
+    assert small.cache_info() == calc.CacheInfo(2, 4, 3, 3)
+    small(1.0)
+    assert calls == [0.0, 1.0, 2.0, 3.0, 1.0]
+    assert calc.cached_integrand(math.sin, max_bytes=10 * calc.CACHE_ENTRY_BYTES
+                                 ).cache_info().max_entries == 10
+
+    root = calc.bisection_pure_python(calc.cached_integrand(math.sin), 3, 4, tol=1e-10)
+    assert math.isclose(root, math.pi, rel_tol=1e-9)
+
+    # unsorted arrays with duplicates and signed zeros, grids with negative points,
+    # cached grids returned as copies and scalar hits on array entries
+    mixed = calc.cached_integrand(np.sin)
+    x = np.array([2.0, -0.0, 0.0, -1.0, 2.0, -3.5])
+    assert np.array_equal(mixed(x), np.sin(x)) and np.signbit(mixed(x)[1])
+    assert mixed.cache_info() == calc.CacheInfo(7, 5, 2**20, 5)
+    grid = np.linspace(-1, 1, 101)
+    first = mixed(grid)
+    first[:] = 0
+    assert np.array_equal(mixed(grid), np.sin(grid))
+    assert mixed(-1.0) == np.sin(-1.0) and mixed.cache_info().misses == 5 + 101 - 2
+
+    # parameterised integrands and root functions are evaluated uncached
+    scaled = calc.cached_integrand(lambda x, k: k * np.sin(x))
+    assert np.array_equal(calc.integrate_many(scaled, (0, np.pi), params=np.array([1.0, 2.0])),
+                          calc.integrate_many(lambda x, k: k * np.sin(x), (0, np.pi),
+                                              params=np.array([1.0, 2.0])))
+    shifted = calc.cached_integrand(lambda x, c: x ** 2 - c)
+    assert math.isclose(calc.secant_pure_python(shifted, 1.0, 2.0, args=(2.0,))["root"],
+                        math.sqrt(2), rel_tol=1e-9)
+    assert scaled.cache_info().misses == shifted.cache_info().misses == 0
+
+def test_measure():
+    """
+    Test the instrumentation: vectorized grids count one call per grid, scalar
+    fallbacks one call per point, and native function pointers are not counted.
+    """
+    vectorized = calc.measure(calc.trapezoid, calc.func1, .01, 10, 100)
+    assert vectorized["result"] == calc.trapezoid(calc.func1, .01, 10, 100)
+    assert (vectorized["calls"], vectorized["samples"]) == (1, 101)
+    assert 0 <= vectorized["function_seconds"] <= vectorized["total_seconds"]
+
+    scalar = calc.measure(calc.trapezoid, math.sin, 0, 1, 100)
+    assert (scalar["calls"], scalar["samples"]) == (102, 101)  # failed array call + points
+    adaptive = calc.measure(calc.adaptive_trap_stack, math.sin, 0, 1, 1e-6)
+    assert adaptive["samples"] == adaptive["result"]["evaluations"]
+    secant = calc.measure(calc.secant_wrapper, math.sin, 3.0, 3.5)
+    assert secant["calls"] == secant["result"]["function_calls"]
+    assert calc.measure(calc.secant_root, math.sin, 3.0, 4.0, 1e-10, 50)["calls"] > 0
+
+    native = calc.measure(calc.secant_root, calc.native_integrand("sin(x)"), 3.0, 4.0, 1e-10, 50)
+    assert math.isclose(native["result"], math.pi)
+    assert native["calls"] is None
+
+    counted = calc.instrument(math.cos)
+    counted(0.0)
+    assert counted.eval_info().calls == 1
+    counted.eval_clear()
+    assert counted.eval_info() == calc.EvalInfo(0, 0, 0.0)
+
+def test_integrate(tmp_path):
+    """
+    Test the integrand classification, the calibration profile and that every backend
+    of integrate() gives the same result, so the backend choice does not matter
+    """
+    path = str(tmp_path / "profile.json")
+    assert calc.integrand_kind(np.sin, 0, 1) == "vectorized"
+    assert calc.integrand_kind(math.sin, 0, 1) == "scalar"
+    assert calc.integrand_kind("sin(x)", 0, 1) == "native"
+    with pytest.raises(ValueError):
+        calc.integrand_kind("sinh(x)", 0, 1)
+
+    # exp(-1/x) is singular at 0, every backend samples it the same way
+    result = calc.integrate(calc.func1, 0, 10, profile=path)
+    assert result["kind"] == "vectorized" and result["seconds"] > 0
+    assert result["backend"] in calc.available_backends("trapezoid", "vectorized")
+    assert math.isclose(result["integral"], calc.trapezoid_numpy(calc.func1, 0, 10, 10000),
+                        rel_tol=1e-13)
+    assert os.path.exists(path)
+    assert calc.load_profile(path)["code"] == calc.code_fingerprint()
+    for method in ("trapezoid", "simpson"):
+        reference = calc.integrate(calc.func1, 0, 10, method, "pure", profile=path)
+        for backend in calc.available_backends(method, "vectorized"):
+            forced = calc.integrate(calc.func1, 0, 10, method, backend, profile=path)
+            assert forced["backend"] == backend
+            assert math.isclose(forced["integral"], reference["integral"], rel_tol=1e-13)
+
+    simpson_result = calc.integrate(math.sin, 0, np.pi, "simpson", n=101, profile=path)
+    assert simpson_result["n"] == 102 and math.isclose(simpson_result["integral"], 2,
+                                                       rel_tol=1e-7)
+    adaptive = calc.integrate(calc.func3, -1, 1, "adaptive", tol=1e-8, profile=path)
+    assert adaptive["backend"] == "pure" and abs(adaptive["integral"] - 2) < 1e-8
+    with pytest.raises(ValueError):
+        calc.integrate(calc.func3, -1, 1, "adaptive", "numpy", profile=path)
+    with pytest.raises(ValueError):
+        calc.integrate(math.sin, 0, 1, "simpson", backend="numpy", profile=path)
+    with pytest.raises(ValueError):
+        calc.integrate(math.sin, 0, 1, "midpoint", profile=path)
+    for method in ("trapezoid", "simpson"):
+        with pytest.raises(ValueError):
+            calc.integrate(np.sin, 0, 1, method, n=0, profile=path)
+
+    if calc.native_backend.capabilities()["calculus"]["trapezoid_native"]:
+        native = calc.integrate("exp(-1/x)", 0.01, 10, profile=path)
+        assert native["backend"] == "ctypes"
+        assert math.isclose(native["integral"],
+                            calc.integrate(calc.func1, 0.01, 10, profile=path)["integral"],
+                            rel_tol=1e-13)
+
+    # a profile of other code or another machine is measured again
+    for field in ("code", "machine"):
+        profile = dict(calc.load_profile(path), **{field: "other"})
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(profile, file)
+        calc._profiles.clear()  # pylint: disable=protected-access
+        assert calc.load_profile(path)[field] == getattr(calc, f"{field}_fingerprint")()
+
+def test_import_time():
+    """
+    Regression test for the import cost of calculus.py, which every worker process
+    pays: SciPy and matplotlib must only be imported on first use.
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import calculus"],
+                            cwd=os.path.dirname(os.path.abspath(calc.__file__)),
+                            capture_output=True, text=True, check=True).stderr
+    # lines of -X importtime: "import time: self [us] | cumulative [us] | module"
+    cumulative = {}
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+    assert "calculus" in cumulative
+    assert not [name for name in cumulative if name.split(".")[0] in ("scipy", "matplotlib")]
+    # about 0.25 s with NumPy only, 1.6 s with SciPy and matplotlib
+    assert cumulative["calculus"] < 1_000_000
+
+def test_sample_with_singularities():
+    '''
+    Unit test for the shared singularity handling of the trapezoid wrappers
+    '''
+    def inverse_sqrt(x):
+        return 1/np.sqrt(np.abs(x))
+    nudged = calc.sample_with_singularities(inverse_sqrt, 0, 1, 100)
+    assert nudged["patched"] == 1
+    assert np.all(np.isfinite(nudged["y"]))
+    assert nudged["x"][0] > 0
+    excluded = calc.sample_with_singularities(inverse_sqrt, -1, 1, 100, policy="exclude")
+    assert excluded["patched"] == 1
+    assert len(excluded["x"]) == 100 and 0 not in excluded["x"]
+    with pytest.raises(ValueError):
+        calc.sample_with_singularities(inverse_sqrt, 0, 1, 100, policy="ignore")
+    for method in (calc.trapezoid_numpy, calc.trapezoid_scipy, calc.trapezoid_python):
+        assert np.isclose(method(np.sin, 0, np.pi, singularity="exclude"), 2)
+
 def d3(x):
     """Derivative of x^3 + 1."""
     return 3 * x**2
@@ -277,6 +564,40 @@ def test_adapt(func, bounds, d, sens, expected):
     """
     result = calc.adapt(func, bounds, d, sens)
     assert np.isclose(result, expected, atol=1e-2)
+def test_adapt_chunked():
+    """
+    Unit test for adapt: splitting the ragged grid into chunks must not
+    change the result, and each cell must match its own np.linspace grid.
+    """
+    bounds = [0.05, 3 * np.pi]
+    full = calc.adapt(calc.func2, bounds, 1000, 0.001)
+    with patch('calculus.CHUNK_SAMPLES', 1000):
+        chunked = calc.adapt(calc.func2, bounds, 1000, 0.001)
+    assert np.isclose(full, chunked, rtol=1e-13)
+    x = np.array([0.0, 1.0, 2.0])
+    counts = np.array([4, 6])
+    expected = (np.trapezoid(cubic(np.linspace(0, 1, 4)), dx=1/3)
+                + np.trapezoid(cubic(np.linspace(1, 2, 6)), dx=1/5))
+    assert np.isclose(calc.ragged_trapezoid(cubic, x, counts), expected)
+def test_integrate_many():
+    """
+    Unit test for batched integration over many bounds and parameters,
+    compared with the single-integral routines.
+    """
+    upper = np.linspace(1, np.pi, 7)
+    result = calc.integrate_many(np.sin, (0, upper), n=1000)
+    assert result.shape == (7,)
+    assert np.allclose(result, [calc.trapezoid(np.sin, 0, b, 1000) for b in upper], rtol=1e-12)
+    rates = np.array([[1.0], [2.0], [3.0]])
+    decay = calc.integrate_many(lambda x, p: np.exp(-p * x), (0, np.array([1.0, 2.0])),
+                                params=rates, method="simpson", n=100)
+    assert decay.shape == (3, 2)
+    assert np.allclose(decay, (1 - np.exp(-rates * np.array([1.0, 2.0]))) / rates, rtol=1e-7)
+    with patch('calculus.CHUNK_SAMPLES', 250):
+        chunked = calc.integrate_many(np.sin, (0, upper), n=1000)
+    assert np.allclose(chunked, result, rtol=1e-14)
+    with pytest.raises(ValueError):
+        calc.integrate_many(np.sin, (0, 1), method="simpson", n=3)
 # Test data for various cases
 test_data_tanh = [
     (math.tanh, -1, 1, 1e-6, 0.0)  # (function, a, b, tol, expected_root)
@@ -322,6 +643,27 @@ def test_singularities_for_bisection(func, a, b, tol):
         calc.bisection_wrapper(func, a, b, tol)
     with pytest.raises(ValueError):
         calc.bisection_pure_python(func, a, b, tol)
+def test_bisection_many():
+    """Test the array bisection against the pure Python implementation."""
+    calls = []
+    def shifted_square(x, c):
+        calls.append(x.size)
+        return x ** 2 - c
+    c = np.linspace(1, 100, 10000)
+    result = calc.bisection_many(shifted_square, 0, 20, c, tol=1e-10)
+    assert result.dtype == calc.ROOT_DTYPE and result.shape == c.shape
+    assert result["converged"].all() and np.allclose(result["root"], np.sqrt(c), atol=1e-10)
+    assert len(calls) <= 2 + result["iterations"].max() <= 40
+    assert math.isclose(calc.bisection_many(np.tanh, -1, 1)["root"],
+                        calc.bisection_pure_python(math.tanh, -1, 1), abs_tol=1e-6)
+    # exact zero at an end, no sign change, maximum iterations, full precision
+    edge = calc.bisection_many(lambda x: x - 1, [0, 1, 2], [1, 3, 3])
+    assert edge["converged"].tolist() == [True, True, False]
+    assert edge["root"][:2].tolist() == [1, 1] and np.isnan(edge["root"][2])
+    assert edge["iterations"].tolist() == [0, 0, 0]
+    stopped = calc.bisection_many(lambda x: x - 1, 0, 3, max_iter=5)
+    assert np.isnan(stopped["root"]) and not stopped["converged"] and stopped["iterations"] == 5
+    assert calc.bisection_many(np.cos, 0, 2, tol=0)["root"] == pytest.approx(np.pi / 2, abs=1e-15)
 @pytest.mark.parametrize("f, a, b, n, expected", [
     (lambda x: x**2, 0, 1, 100, 1/3),
     (lambda x: x ** 2, 0, 1, 100, 1/3),
@@ -330,6 +672,33 @@ def test_trapezoid(f, a, b, n, expected):
     """Unit test for trapezoid pure python"""
     result = calc.trapezoid(f, a, b, n)
     assert abs(result - expected) < 1e-4, f"Failed for f={f}, a={a}, b={b}, n={n}"
+def test_vectorized_matches_scalar_fallback():
+    """
+    The array fast path of trapezoid and simpsons_rule must agree with
+    the point-by-point path used for scalar-only integrands.
+    """
+    assert np.isclose(calc.trapezoid(np.sin, 0, np.pi, 1000),
+                      calc.trapezoid(math.sin, 0, np.pi, 1000), rtol=1e-12)
+    assert np.isclose(calc.simpsons_rule(calc.func3, -1, 1, 100),
+                      calc.simpsons_rule(lambda x: math.pow(x, 3) + 1, -1, 1, 100),
+                      rtol=1e-12)
+def test_evaluate_grid_falls_back_on_singularity():
+    """
+    Non-finite samples of a vectorized integrand are re-evaluated with Python
+    floats, so the original ZeroDivisionError is preserved, while masked or
+    harmless floating point warnings keep the single array call.
+    """
+    with pytest.raises(ZeroDivisionError):
+        calc.trapezoid(lambda x: 1 / x, 0, 1, 10)
+    assert math.isclose(calc.trapezoid(calc.func1, 0, 1, 10),
+                        calc.trapezoid(calc.func1, 1e-300, 1, 10))  # exp(-1/0) = 0
+    sinc = calc.instrument(lambda x: np.where(x == 0, 1.0, np.sin(x) / x))
+    x = np.linspace(-1, 1, 201)
+    assert np.allclose(calc.evaluate_grid(sinc, x), np.sinc(x / np.pi), rtol=1e-15)
+    assert sinc.eval_info().calls == 1
+    log = calc.instrument(np.log)
+    assert calc.evaluate_grid(log, np.array([0.0, 1.0])).tolist() == [-math.inf, 0.0]
+    assert log.eval_info().calls == 2
 @pytest.mark.parametrize("f, a, b, tol, expected", [
     (lambda x: x**2, 0, 1, 1e-6, 1/3),
     (lambda x: x**2, 0, 1, 1e-6, 1/3),
@@ -340,6 +709,135 @@ def test_adaptive_trap_py(f, a, b, tol, expected):
     result = calc.adaptive_trap_py(f, a, b, tol)
     assert abs(result - expected) < 1e-6, f"Failed for f={f}, a={a}, b={b}, tol={tol}"
     assert np.isclose(calc.trapezoid_scipy(exp_minus_one_by_x, 0, 1), 0.148496)
+def test_adaptive_trap_stack():
+    """
+    Unit test for the iterative adaptive trapezoid: every abscissa is
+    evaluated once and deep tolerances do not hit the recursion limit.
+    """
+    calls = []
+    def counted(x):
+        calls.append(x)
+        return 1/(1 + x**2)
+    result = calc.adaptive_trap_stack(counted, 0, 1, 1e-6)
+    assert abs(result["integral"] - np.pi / 4) < 1e-6
+    assert result["evaluations"] == len(calls) == 2 * result["intervals"] + 1
+    assert result["error"] < 1e-6
+    deep = calc.adaptive_trap_stack(calc.func1, 0.01, 10, 1e-9, max_depth=None)
+    assert abs(deep["integral"] - 7.225450221940204) < 1e-9
+    # unreachable tolerances stop at intervals of one ulp or non-finite differences
+    step = calc.adaptive_trap_stack(lambda x: 1.0 if x > 0.3 else 0.0, 0, 1, 1e-6,
+                                    max_depth=None)
+    assert abs(step["integral"] - 0.7) < 1e-6 and step["evaluations"] < 1000
+    singular = calc.adaptive_trap_stack(lambda x: math.inf if x == 0 else 1 / math.sqrt(x),
+                                        0, 1, 1e-6, max_depth=None)
+    assert not math.isfinite(singular["integral"])
+
+@pytest.mark.parametrize("method", ["trapezoid", "simpson"])
+def test_integrate_to_tol(method):
+    """
+    Test integrate_to_tol: the tolerance is met with nested grids, the evaluations
+    are n + 1 and max_n stops the refinement.
+    """
+    result = calc.integrate_to_tol(calc.func1, .01, 10, rtol=1e-10, method=method)
+    assert result["converged"]
+    assert abs(result["integral"] - 7.225450221940204) < 1e-9
+    assert result["error"] <= 1e-10 * abs(result["integral"])
+    assert result["evaluations"] == result["n"] + 1
+    assert calc.integrate_to_tol(calc.func3, -1, 1, method=method)["integral"] == 2
+
+    limited = calc.integrate_to_tol(np.sin, 0, np.pi, rtol=1e-14, atol=0, method=method,
+                                    max_n=64)
+    assert not limited["converged"]
+    assert limited["n"] == 64
+    with pytest.raises(ValueError):
+        calc.integrate_to_tol(np.sin, 0, 1, method="midpoint")
+
+def test_romberg():
+    """
+    Unit test for Romberg integration: exact for cubics after the minimum
+    number of levels and far fewer evaluations than a fixed-n trapezoid.
+    """
+    cubic_result = calc.romberg(calc.func3, -1, 1)
+    assert cubic_result["converged"] is True
+    assert math.isclose(cubic_result["integral"], 2.0, rel_tol=1e-14)
+    assert cubic_result["evaluations"] == 2 ** (calc.ROMBERG_MIN_LEVELS - 1) + 1
+    result = calc.romberg(calc.func1, 0.01, 10, tol=1e-10)
+    assert abs(result["integral"] - 7.225450221940204) < 1e-10
+    assert result["evaluations"] < 10 ** 4
+    capped = calc.romberg(calc.func2, 0.01, 3 * np.pi, tol=1e-12, max_levels=5)
+    assert capped["converged"] is False and capped["levels"] == 5
+def test_trapezoid_levels():
+    """
+    Each nested trapezoid level must equal a fresh trapezoid with the same n.
+    """
+    levels = calc.trapezoid_levels(np.sin, 0, np.pi)
+    for _ in range(6):
+        integral, n, evaluations = next(levels)
+        assert math.isclose(integral, calc.trapezoid(np.sin, 0, np.pi, n), rel_tol=1e-13)
+        assert evaluations == n + 1
+def test_gauss_legendre():
+    """
+    Unit test for the fixed-order Gauss-Legendre rule and its cached tables.
+    """
+    # exact for polynomials up to degree 2 * order - 1
+    assert math.isclose(calc.gauss_legendre(calc.func3, -1, 1, order=2), 2.0, rel_tol=1e-14)
+    assert math.isclose(calc.gauss_legendre(lambda x: x**9, 0, 1, order=5), 0.1, rel_tol=1e-13)
+    assert math.isclose(calc.gauss_legendre(math.sin, 0, math.pi, order=12), 2.0, rel_tol=1e-12)
+    assert calc.gauss_legendre_nodes(12) is calc.gauss_legendre_nodes(12)
+    with pytest.raises(ValueError):
+        calc.gauss_legendre_nodes(0)
+@pytest.mark.parametrize("rule, gauss_order", [("G7K15", 7), ("G10K21", 10)])
+def test_kronrod_nodes(rule, gauss_order):
+    """
+    The embedded Gauss nodes must match the Gauss-Legendre nodes and the
+    Kronrod rule must integrate polynomials up to degree 3n + 1 exactly.
+    """
+    nodes, kronrod, gauss = calc.kronrod_nodes(rule)
+    assert np.allclose(np.sort(nodes[gauss > 0]),
+                       calc.gauss_legendre_nodes(gauss_order)[0], atol=1e-14)
+    for degree in range(3 * gauss_order + 2):
+        exact = (1 - (-1) ** (degree + 1)) / (degree + 1)
+        assert abs(kronrod @ nodes ** degree - exact) < 1e-14
+@pytest.mark.parametrize("rule", ["G7K15", "G10K21"])
+def test_gauss_kronrod(rule):
+    """
+    Unit test for adaptive Gauss-Kronrod quadrature on the README integrals.
+    """
+    result = calc.gauss_kronrod(calc.func1, 0.01, 10, tol=1e-10, rule=rule)
+    assert result["converged"] is True
+    assert abs(result["integral"] - 7.225450221940204) < 1e-10
+    assert result["evaluations"] < 500
+    assert math.isclose(calc.gauss_kronrod(calc.func3, -1, 1, rule=rule)["integral"], 2.0)
+    with pytest.raises(ValueError):
+        calc.gauss_kronrod(calc.func3, -1, 1, rule="G5K11")
+def test_parallel_integrate():
+    """
+    Unit test for the process-pool integration: the result must be bit-for-bit
+    identical for every worker count and match the serial rules.
+    """
+    with patch('calculus.PARALLEL_MIN_SECONDS', 0):
+        results = {workers: calc.parallel_integrate(calc.func_3, (0, math.pi), 10000,
+                                                    workers=workers, chunk_size=999)
+                   for workers in (1, 2, 3)}
+        simpson_result = calc.parallel_integrate(calc.func_3, (0, math.pi), 10000, "simpson",
+                                                 workers=2, chunk_size=999)
+    assert results[1] == results[2] == results[3]
+    assert math.isclose(results[1], calc.trapezoid(calc.func_3, 0, math.pi, 10000), rel_tol=1e-12)
+    assert math.isclose(simpson_result, calc.simpsons_rule(calc.func_3, 0, math.pi, 10000),
+                        rel_tol=1e-12)
+    # local functions cannot be sent to worker processes and are integrated serially
+    def local_sin(x):
+        return math.sin(x)
+    with patch('calculus.PARALLEL_MIN_SECONDS', 0):
+        assert calc.parallel_integrate(local_sin, (0, math.pi), 10000,
+                                       workers=2, chunk_size=999) == results[1]
+    # no worker pool is left running when the shared block cannot be allocated
+    with patch('calculus.PARALLEL_MIN_SECONDS', 0), \
+            patch('calculus.shared_memory.SharedMemory', side_effect=OSError("no space")), \
+            patch('calculus.ProcessPoolExecutor') as pool:
+        with pytest.raises(OSError):
+            calc.parallel_integrate(calc.func_3, (0, math.pi), 10000, workers=2, chunk_size=999)
+    pool.assert_not_called()
 def test_secant_pure_matches_scipy():
     '''
     Unit test to check if scipy and pure python implementation of
@@ -428,6 +926,104 @@ def test_ctypes_invoke_with_floats():
     result = calculus.invoke_with_floats(wrapped_callback, -2.0, -3.0)
     assert math.isclose(result, 25.0, rel_tol=1e-5), f"Expected 25.0, got {result}"
 
+def test_native_functions():
+    """
+    Test the compiled function registry of lib_calculus.so against the
+    Python functions and use the native functions in the ctypes routines.
+    """
+    x = 0.7
+    assert math.isclose(calc.native_integrand("exp(-1/x)")(x), calc.func1(x))
+    assert math.isclose(calc.native_integrand("cos(1/x)")(x), calc.func2(x))
+    assert math.isclose(calc.native_integrand("polynomial", [1, 0, 0, 1])(x), calc.func3(x))
+    assert math.isclose(calc.native_integrand("tanh(x)")(x), math.tanh(x))
+    assert math.isclose(calc.native_integrand(4)(x), math.sin(x))
+    assert math.isclose(calc.native_integrand("1/sin(x)")(x), 1 / math.sin(x))
+    with pytest.raises(ValueError):
+        calc.native_integrand("sqrt(x)")
+    with pytest.raises(ValueError):
+        calc.native_integrand("polynomial")
+    with pytest.raises(ValueError):
+        calc.native_integrand("polynomial", [])
+
+    # every polynomial keeps its own coefficients
+    cubic_pointer = calc.native_integrand("polynomial", [1, 0, 0, 1])
+    line_id = calc.native_polynomial([2, 3])
+    assert calc.native_polynomial([1.0, 0.0, 0.0, 1.0]) != line_id
+    assert calc.native_polynomial([2, 3]) == line_id
+    assert math.isclose(cubic_pointer(x), calc.func3(x))
+    assert math.isclose(calc.native_integrand(line_id)(x), 2 + 3 * x)
+    assert math.isnan(calc.native_backend.function("native_evaluate")(2, x))
+
+    assert math.isclose(calc.ctypes_invoke_with_floats(calc.native_integrand("sin(x)"),
+                                                       1.0, 2.0), math.sin(3.0))
+    root = calc.secant_root(calc.native_integrand("sin(x)"), 3.0, 4.0, tol=1e-10, max_iter=50)
+    assert math.isclose(root, math.pi, rel_tol=1e-9)
+    native = calc.adapt_c(calc.native_integrand("exp(-1/x)"), .01, 10, 100, 1000)
+    python = calc.adapt_c(lambda x: math.exp(-1/x), .01, 10, 100, 1000)
+    assert math.isclose(native, python, rel_tol=1e-12)
+
+def test_integrate_native():
+    """
+    Test the OpenMP trapezoid and Simpson kernels on native functions and on
+    NumPy samples against trapezoid_numpy and scipy.
+    """
+    numpy_result = calc.trapezoid_numpy(calc.func1, .01, 10, 10000)
+    for threads in (0, 1, 3):
+        native = calc.integrate_native("exp(-1/x)", (.01, 10), 10000, threads=threads)
+        assert math.isclose(native, numpy_result, rel_tol=1e-12)
+    simpson_native = calc.integrate_native("exp(-1/x)", (.01, 10), 10000, "simpson", 2)
+    assert math.isclose(simpson_native, 7.225450221940204, rel_tol=1e-9)
+
+    x = np.linspace(0, np.pi, 1001)
+    y = np.sin(x)
+    assert math.isclose(calc.integrate_native(y, (0, np.pi), threads=2), np.trapezoid(y, x),
+                        rel_tol=1e-12)
+    assert math.isclose(calc.integrate_native(y, (0, np.pi), method="simpson"),
+                        simpson(y, x=x), rel_tol=1e-12)
+
+    with pytest.raises(ValueError):
+        calc.integrate_native(y[:-1], (0, np.pi), method="simpson")
+    with pytest.raises(ValueError):
+        calc.integrate_native("sin(x)", (0, 1), 11, "simpson")
+    with pytest.raises(ValueError):
+        calc.integrate_native("sqrt(x)", (0, 1))
+    cubic_id = calc.native_polynomial([1, 0, 0, 1])
+    assert math.isclose(calc.integrate_native(cubic_id, (-1, 1), 100, "simpson"), 2, rel_tol=1e-12)
+    calc.native_polynomial([5])
+    assert math.isclose(calc.integrate(cubic_id, -1, 1, "simpson", n=100)["integral"], 2,
+                        rel_tol=1e-12)
+    for polynomial in ("polynomial", calc.NATIVE_FUNCTIONS["polynomial"]):
+        with pytest.raises(ValueError):
+            calc.integrate_native(polynomial, (0, 1))
+        with pytest.raises(ValueError):
+            calc.integrate(polynomial, 0, 1)
+    with pytest.raises(ValueError):
+        calc.integrate_native(y, (0, np.pi), method="midpoint")
+
+def test_substitution():
+    """
+    Test the variable substitutions on the endpoint-singular and endpoint-oscillatory
+    integrals, where they need far fewer points than a uniform grid.
+    """
+    reference = 7.906964366294161  # cos(1/x) on [0.01, 3 pi]
+    assert math.isclose(calc.trapezoid(calc.func1, 0, 10, 200, "tanh-sinh"),
+                        7.225450221940204, rel_tol=1e-12)
+    assert math.isclose(calc.trapezoid(calc.func2, .01, 3 * np.pi, 600, "tanh-sinh"),
+                        reference, rel_tol=1e-12)
+    assert abs(calc.trapezoid(calc.func2, .01, 3 * np.pi, 60000) - reference) > 1e-6
+    assert math.isclose(calc.trapezoid(lambda x: x ** -0.5, 0, 1, 40, "tanh-sinh"), 2,
+                        rel_tol=1e-12)
+    assert math.isclose(calc.trapezoid(lambda x: 1 / x ** 2, 1, 1e6, 10, "inverse"), 1 - 1e-6,
+                        rel_tol=1e-14)
+    assert math.isclose(calc.simpsons_rule(np.log, 0, 1, 400, "exp"), -1, rel_tol=1e-5)
+    square = (lambda t: t * t, lambda t: 2 * t, 1, math.sqrt(2))
+    assert math.isclose(calc.trapezoid(math.cos, 1, 2, 1000, square),
+                        math.sin(2) - math.sin(1), rel_tol=1e-5)
+    with pytest.raises(ValueError):
+        calc.trapezoid(calc.func1, 0, 10, 100, "inverse")
+    with pytest.raises(ValueError):
+        calc.trapezoid(calc.func1, 0, 10, 100, "sinh")
+
 def test_secant_root_positive_root():
     """
     Test secant_root to find the positive root of the equation x^2 - 4 = 0.
@@ -0,0 +1,47 @@
+"""
+Unit testing module for testing functions in convergence_study.py
+"""
+import math
+import matplotlib
+import convergence_study as study
+
+matplotlib.use("Agg")
+
+def test_reference_integral():
+    """
+    Test the reference values against the known integrals.
+    """
+    reference, difference = study.reference_integral("x^3+1")
+    assert math.isclose(reference, 2, rel_tol=1e-15)
+    reference, difference = study.reference_integral("exp(-1/x)")
+    assert math.isclose(reference, 7.225450221940204, rel_tol=1e-14)
+    assert difference < 1e-12
+
+def test_minimum_step():
+    """
+    Test the doubling and bisection search on a rule with known error 1/n^2.
+    """
+    calls = []
+    def point(n):
+        calls.append(n)
+        return {"digits": 2 * math.log10(n)}
+    assert study.minimum_step(point, 3, 1000) == {"digits": 2 * math.log10(32)}
+    assert max(calls) == 32
+    assert study.minimum_step(point, 7, 1000) is None
+
+def test_run_study(tmp_path):
+    """
+    Test a small study in one process: the minimum evaluations grow with the target
+    digits, the trapezoid needs n + 1 evaluations and the plots are written.
+    """
+    table, sweep = study.run_study(["exp(-1/x)"], ["trapezoid", "romberg"], range(1, 6),
+                                   workers=1)
+    trapezoid = table[table["method"] == "trapezoid"]
+    assert list(trapezoid["target_digits"]) == [1, 2, 3, 4, 5]
+    assert list(trapezoid["evaluations"]) == sorted(trapezoid["evaluations"])
+    assert all(trapezoid["evaluations"] == trapezoid["parameter"] + 1)
+    assert all(table["digits"] >= table["target_digits"])
+    assert set(sweep["method"]) == {"trapezoid", "romberg"}
+
+    files = study.plot_convergence(sweep, str(tmp_path))
+    assert [f.rsplit("/", 1)[-1] for f in files] == ["convergence_exp-1-x.png"]
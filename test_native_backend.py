@@ -0,0 +1,55 @@
+"""
+Unit testing module for testing functions in native_backend.py
+"""
+import gc
+import math
+from unittest.mock import patch
+import pytest
+import calculus as calc
+import native_backend as backend
+
+def test_load_library_once(tmp_path, monkeypatch):
+    """
+    Test that the libraries are loaded once, independent of the working directory,
+    with the signatures declared.
+    """
+    monkeypatch.chdir(tmp_path)
+    assert backend.load_library("calculus") is backend.load_library("calculus")
+    assert backend.function("secant_root").restype is backend.function("secant_root").restype
+    assert backend.function("calculate_square")(3.0) == 9.0
+    assert math.isclose(calc.secant_root(math.sin, 3.0, 4.0, 1e-10, 50), math.pi)
+    assert all(all(symbols.values()) for symbols in backend.capabilities().values())
+
+def test_callback_cache():
+    """
+    Test that callback wrappers are reused per callable and released with it.
+    """
+    def double(x):
+        return 2 * x
+    wrapped = backend.callback(double)
+    assert backend.callback(double) is wrapped
+    assert backend.function("invoke_with_floats")(wrapped, 1.0, 2.0) == 6.0
+    native = calc.native_integrand("sin(x)")
+    assert backend.callback(native) is native
+    assert calc.ctypes_invoke_with_floats(math.cos, 0.0, 0.0) == 1.0
+
+    count = len(backend._callbacks)  # pylint: disable=protected-access
+    del double, wrapped
+    gc.collect()
+    assert len(backend._callbacks) == count - 1  # pylint: disable=protected-access
+
+def test_missing_library():
+    """
+    Test that a missing library is reported by capabilities and raises OSError.
+    """
+    backend.load_library.cache_clear()
+    try:
+        with patch.dict(backend.LIBRARIES, {"calc": "missing.so"}):
+            available = backend.capabilities()
+            assert not any(available["calc"].values())
+            assert all(available["calculus"].values())
+            with pytest.raises(OSError):
+                calc.adapt_c(math.sin, 0, 1)
+    finally:
+        backend.load_library.cache_clear()
+    assert calc.adapt_c(math.sin, 0, 1) > 0
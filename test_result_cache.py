@@ -0,0 +1,80 @@
+"""
+Unit testing module for testing functions in result_cache.py
+"""
+import math
+from unittest.mock import patch
+import numpy as np
+import calculus as calc
+import convergence_study as study
+import result_cache as cache
+
+def test_cache_key():
+    """
+    Test that keys follow the code, constants, closures, method, parameters, the code
+    of calculus.py and, for timings, the machine.
+    """
+    def scaled(k):
+        return lambda x: k * x
+    key = cache.cache_key(calc.func1, calc.romberg, (0.01, 10))
+    assert key == cache.cache_key(calc.func1, calc.romberg, (0.01, 10))
+    assert key != cache.cache_key(calc.func2, calc.romberg, (0.01, 10))
+    assert key != cache.cache_key(calc.func1, calc.gauss_kronrod, (0.01, 10))
+    assert key != cache.cache_key(calc.func1, calc.romberg, (0.01, 10.000000000000002))
+    assert cache.cache_key(lambda x: x ** 2, "m") != cache.cache_key(lambda x: x ** 3, "m")
+    assert cache.cache_key(scaled(2), "m") == cache.cache_key(scaled(2), "m")
+    assert cache.cache_key(scaled(2), "m") != cache.cache_key(scaled(3), "m")
+    assert cache.cache_key(np.sin, "m") != cache.cache_key(math.sin, "m")
+    timed = cache.cache_key(calc.func1, calc.romberg, (0.01, 10), machine=True)
+    assert timed not in (key, cache.cache_key(calc.func1, calc.romberg, (0.01, 10.5), True))
+    with patch.object(calc, "code_fingerprint", return_value="edited"):
+        assert key != cache.cache_key(calc.func1, calc.romberg, (0.01, 10))
+    with patch.object(calc, "machine_fingerprint", return_value="other host"):
+        assert key == cache.cache_key(calc.func1, calc.romberg, (0.01, 10))
+        assert timed != cache.cache_key(calc.func1, calc.romberg, (0.01, 10), machine=True)
+
+def test_cached_call(tmp_path):
+    """
+    Test hits, size-based eviction of the least recently used results and invalidation.
+    """
+    path = str(tmp_path / "cache.sqlite")
+    calls = []
+    def compute(value):
+        calls.append(value)
+        return {"integral": value, "samples": np.zeros(100)}
+
+    first = cache.cached_call(lambda: compute(1.0), calc.func1, "trapezoid", (1,), path)
+    again = cache.cached_call(lambda: compute(1.0), calc.func1, "trapezoid", (1,), path)
+    assert calls == [1.0] and again["integral"] == first["integral"]
+    count, size = cache.cache_info(path)
+    assert count == 1 and size > 800
+
+    cache.cached_call(lambda: compute(2.0), calc.func1, "romberg", (2,), path)
+    cache.cached_call(lambda: compute(1.0), calc.func1, "trapezoid", (1,), path)  # used last
+    cache.cached_call(lambda: compute(3.0), calc.func1, "romberg", (3,), path,
+                      max_bytes=2 * size)
+    assert cache.cache_info(path)[0] == 2
+    cache.cached_call(lambda: compute(1.0), calc.func1, "trapezoid", (1,), path)
+    cache.cached_call(lambda: compute(2.0), calc.func1, "romberg", (2,), path)
+    assert calls == [1.0, 2.0, 3.0, 2.0]  # romberg (2,) was evicted
+
+    assert cache.invalidate(path, method="romberg") == 2
+    assert cache.invalidate(path, other_versions=True) == 0
+    assert cache.invalidate(path) == 1
+    assert cache.cache_info(path) == (0, 0)
+
+def test_study_uses_cache(tmp_path):
+    """
+    Test that a second convergence study is answered from the cache, unless the
+    study code changed.
+    """
+    path = str(tmp_path / "cache.sqlite")
+    table, _ = study.run_study(["x^3+1"], ["trapezoid"], range(1, 4), workers=1, cache=path)
+    stored = cache.cache_info(path)[0]
+    assert stored > 0
+    again, _ = study.run_study(["x^3+1"], ["trapezoid"], range(1, 4), workers=1, cache=path)
+    assert cache.cache_info(path)[0] == stored
+    assert again.equals(table)
+    # an edit of convergence_study.py computes the study points again
+    with patch.object(cache, "source_fingerprint", return_value="edited"):
+        study.run_study(["x^3+1"], ["trapezoid"], range(1, 4), workers=1, cache=path)
+    assert cache.cache_info(path)[0] == 2 * stored
@@ -45,6 +45,9 @@ def plot_integral(integration_details, n=1000):
     # Plot the function
     plt.plot(x, y, label=f"${func_name}(x)$")
     plt.fill_between(x, y, alpha=0.3, label=f"Area = {result:.6f}, Steps = {steps}")
+    # Running integral from a to x, computed in one O(n) pass
+    plt.plot(x, calc.cumulative_integral(y, x), linestyle="--",
+             label=f"$\\int_{{a}}^{{x}} {func_name}(t)\\,dt$")
     plt.title(f"Integration of ${func_name}(x)$ using {method_name}")
     plt.xlabel("x")
     plt.ylabel(f"${func_name}(x)$")